@@ -1,2 +1,13 @@
 from sentence_transformers import SentenceTransformer
-model = SentenceTransformer('bert-base-multilingual')
\ No newline at end of file
+
+MODEL_NAME = 'bert-base-multilingual'
+
+_model = None
+
+
+def get_model() -> SentenceTransformer:
+    """Загружает модель один раз на процесс"""
+    global _model
+    if _model is None:
+        _model = SentenceTransformer(MODEL_NAME)
+    return _model
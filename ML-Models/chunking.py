@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Сколько токенов соседние фрагменты делят между собой, чтобы фраза
+# на границе окна целиком попала хотя бы в один фрагмент
+DEFAULT_OVERLAP = 64
+
+
+@dataclass
+class Chunk:
+    index: int
+    start_char: int
+    end_char: int
+    text: str
+
+
+def window_size(model) -> int:
+    """Длина окна в токенах: максимум модели без служебных [CLS] и [SEP]"""
+    return model.max_seq_length - 2
+
+
+def split_into_chunks(text: str, tokenizer, window: int, overlap: int = DEFAULT_OVERLAP,
+                      max_chunks: Optional[int] = None) -> List[Chunk]:
+    """
+    Режет текст на окна по window токенов с перекрытием overlap токенов.
+
+    Границы фрагментов берутся из offset_mapping быстрого токенизатора,
+    поэтому фрагмент - это точный срез исходного текста, а не склейка
+    токенов, и его можно показать пользователю как найденный абзац.
+    """
+    if overlap >= window:
+        raise ValueError("overlap должен быть меньше window")
+    if not text or not text.strip():
+        return []
+
+    offsets = tokenizer(
+        text,
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        truncation=False,
+        verbose=False,
+    )['offset_mapping']
+
+    chunks = []
+    step = window - overlap
+    for start in range(0, len(offsets), step):
+        end = min(start + window, len(offsets))
+        start_char = offsets[start][0]
+        end_char = offsets[end - 1][1]
+        chunks.append(Chunk(len(chunks), start_char, end_char, text[start_char:end_char]))
+        if end == len(offsets) or (max_chunks is not None and len(chunks) >= max_chunks):
+            break
+    return chunks
@@ -7,16 +7,17 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from database.models import Base
-from database.config import DATABASE_URL
+from database.config import get_database_url
 
 target_metadata = Base.metadata
 
 config = context.config
-fileConfig(config.config_file_name)
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
 
 def run_migrations_offline():
     context.configure(
-        url=DATABASE_URL,
+        url=get_database_url(),
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
@@ -0,0 +1,53 @@
+"""article_vector_pgvector
+
+Revision ID: 2f6d9b4e7a13
+Revises: 8c3f2a6e91d7
+Create Date: 2026-10-18 13:20:44.167392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6d9b4e7a13'
+down_revision: Union[str, None] = '8c3f2a6e91d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VECTOR_DIM = 768
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.execute(
+        f"ALTER TABLE article_vector ALTER COLUMN vector_data "
+        f"TYPE vector({VECTOR_DIM}) USING vector_data::vector({VECTOR_DIM})"
+    )
+
+    # HNSW появился в pgvector 0.5.0, на старых версиях используем IVFFlat
+    version = op.get_bind().execute(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    ).scalar()
+    major, minor = (int(part) for part in version.split('.')[:2])
+    if (major, minor) >= (0, 5):
+        op.execute(
+            "CREATE INDEX ix_article_vector_vector_data ON article_vector "
+            "USING hnsw (vector_data vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+        )
+    else:
+        op.execute(
+            "CREATE INDEX ix_article_vector_vector_data ON article_vector "
+            "USING ivfflat (vector_data vector_cosine_ops) WITH (lists = 100)"
+        )
+
+def downgrade():
+    op.drop_index('ix_article_vector_vector_data', table_name='article_vector')
+    op.alter_column(
+        'article_vector', 'vector_data',
+        type_=postgresql.ARRAY(sa.Float()),
+        postgresql_using='vector_data::real[]::double precision[]'
+    )
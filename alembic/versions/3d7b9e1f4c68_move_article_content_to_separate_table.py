@@ -0,0 +1,114 @@
+"""move_article_content_to_separate_table
+
+Revision ID: 3d7b9e1f4c68
+Revises: 6a2c5e8f0b37
+Create Date: 2026-10-18 16:04:52.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d7b9e1f4c68'
+down_revision: Union[str, None] = '6a2c5e8f0b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce({title}, '')), 'A') || "
+    "setweight(to_tsvector('russian', left(coalesce({content}, ''), 300000)), 'B')"
+)
+
+
+def upgrade():
+    op.create_table(
+        'article_content',
+        sa.Column('article_id', sa.Integer(),
+                  sa.ForeignKey('article.article_id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True),
+    )
+
+    # lz4 сжимает и особенно распаковывает TOAST заметно быстрее pglz (PostgreSQL 14+,
+    # сервер должен быть собран с lz4); на остальных серверах остается pglz
+    if op.get_bind().dialect.server_version_info >= (14,):
+        op.execute("""
+            DO $$
+            BEGIN
+                ALTER TABLE article_content ALTER COLUMN content SET COMPRESSION lz4;
+            EXCEPTION WHEN feature_not_supported THEN
+                RAISE NOTICE 'lz4 is not available, article_content.content stays pglz';
+            END $$
+        """)
+
+    # search_vector зависит от заголовка в article и текста в article_content,
+    # поэтому вместо generated column его поддерживают триггеры на обеих таблицах
+    op.execute(f"""
+        CREATE FUNCTION article_content_search_vector() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR_SQL.format(
+                title='(SELECT title FROM article WHERE article_id = NEW.article_id)',
+                content='NEW.content'
+            )};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER article_content_search_vector
+        BEFORE INSERT OR UPDATE OF content ON article_content
+        FOR EACH ROW EXECUTE FUNCTION article_content_search_vector()
+    """)
+    op.execute(f"""
+        CREATE FUNCTION article_title_search_vector() RETURNS trigger AS $$
+        BEGIN
+            UPDATE article_content
+            SET search_vector = {SEARCH_VECTOR_SQL.format(title='NEW.title', content='content')}
+            WHERE article_id = NEW.article_id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER article_title_search_vector
+        AFTER UPDATE OF title ON article
+        FOR EACH ROW WHEN (OLD.title IS DISTINCT FROM NEW.title)
+        EXECUTE FUNCTION article_title_search_vector()
+    """)
+
+    # Строка article_content есть у каждой статьи, даже без текста: иначе статья
+    # не найдется поиском по заголовку. content || '' заставляет PostgreSQL
+    # заново сжать значение методом столбца, а не скопировать pglz-датум как есть
+    op.execute("""
+        INSERT INTO article_content (article_id, content)
+        SELECT article_id, content || '' FROM article
+    """)
+    op.create_index('ix_article_content_search_vector', 'article_content', ['search_vector'],
+                    postgresql_using='gin')
+
+    op.drop_index('ix_article_search_vector', table_name='article')
+    op.drop_column('article', 'search_vector')
+    op.drop_column('article', 'content')
+    # Место в article освобождается только после VACUUM FULL article (вне транзакции миграции)
+
+def downgrade():
+    op.add_column('article', sa.Column('content', sa.Text(), nullable=True))
+    op.execute("""
+        UPDATE article AS a SET content = c.content
+        FROM article_content AS c
+        WHERE c.article_id = a.article_id
+    """)
+    op.execute("DROP TRIGGER article_title_search_vector ON article")
+    op.execute("DROP FUNCTION article_title_search_vector()")
+    op.drop_table('article_content')
+    op.execute("DROP FUNCTION article_content_search_vector()")
+    op.add_column('article', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(SEARCH_VECTOR_SQL.format(title='title', content='content'), persisted=True)
+    ))
+    op.create_index('ix_article_search_vector', 'article', ['search_vector'], postgresql_using='gin')
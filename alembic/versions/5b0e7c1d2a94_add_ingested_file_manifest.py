@@ -0,0 +1,39 @@
+"""add_ingested_file_manifest
+
+Revision ID: 5b0e7c1d2a94
+Revises: d9674af8ec72
+Create Date: 2026-10-18 11:05:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e7c1d2a94'
+down_revision: Union[str, None] = 'd9674af8ec72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table('ingested_file',
+    sa.Column('file_id', sa.Integer(), nullable=False),
+    sa.Column('file_path', sa.String(length=1024), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=False),
+    sa.Column('file_mtime_ns', sa.BigInteger(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('article_id', sa.Integer(), nullable=True),
+    sa.Column('ingested_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['article_id'], ['article.article_id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('file_id'),
+    sa.UniqueConstraint('file_path')
+    )
+    op.create_index(op.f('ix_ingested_file_content_hash'), 'ingested_file', ['content_hash'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_ingested_file_content_hash'), table_name='ingested_file')
+    op.drop_table('ingested_file')
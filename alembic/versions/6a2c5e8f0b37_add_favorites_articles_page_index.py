@@ -0,0 +1,29 @@
+"""add_favorites_articles_page_index
+
+Revision ID: 6a2c5e8f0b37
+Revises: e4a8d3f5c216
+Create Date: 2026-10-18 15:11:06.734920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a2c5e8f0b37'
+down_revision: Union[str, None] = 'e4a8d3f5c216'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_favorites_articles_favorites_id_added_at',
+        'favorites_articles',
+        ['favorites_id', 'added_at', 'article_id']
+    )
+
+def downgrade():
+    op.drop_index('ix_favorites_articles_favorites_id_added_at', table_name='favorites_articles')
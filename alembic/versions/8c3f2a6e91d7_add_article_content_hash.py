@@ -0,0 +1,48 @@
+"""add_article_content_hash
+
+Revision ID: 8c3f2a6e91d7
+Revises: 5b0e7c1d2a94
+Create Date: 2026-10-18 11:42:37.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3f2a6e91d7'
+down_revision: Union[str, None] = '5b0e7c1d2a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('article', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    # Хеши уже загруженных файлов берем из манифеста. Одинаковые PDF по разным путям
+    # в одном батче раньше становились разными статьями с одним хешем: хеш получает
+    # только статья с наименьшим article_id, у остальных копий он остается NULL,
+    # иначе уникальный индекс ниже не создастся
+    op.execute(
+        """
+        UPDATE article AS a
+        SET content_hash = h.content_hash
+        FROM (
+            SELECT DISTINCT ON (content_hash) content_hash, article_id
+            FROM (
+                SELECT DISTINCT ON (article_id) article_id, content_hash
+                FROM ingested_file
+                WHERE status = 'ingested' AND article_id IS NOT NULL
+                ORDER BY article_id, ingested_at DESC
+            ) AS f
+            ORDER BY content_hash, article_id
+        ) AS h
+        WHERE h.article_id = a.article_id
+        """
+    )
+    op.create_index(op.f('ix_article_content_hash'), 'article', ['content_hash'], unique=True)
+
+def downgrade():
+    op.drop_index(op.f('ix_article_content_hash'), table_name='article')
+    op.drop_column('article', 'content_hash')
@@ -0,0 +1,54 @@
+"""add_article_chunk_vector
+
+Revision ID: 9e5f1a7c3b20
+Revises: 3d7b9e1f4c68
+Create Date: 2026-10-18 16:48:13.905127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5f1a7c3b20'
+down_revision: Union[str, None] = '3d7b9e1f4c68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VECTOR_DIM = 768
+
+
+def upgrade():
+    op.create_table(
+        'article_chunk_vector',
+        sa.Column('chunk_vector_id', sa.Integer(), primary_key=True),
+        sa.Column('article_id', sa.Integer(),
+                  sa.ForeignKey('article.article_id', ondelete='CASCADE'), nullable=False),
+        sa.Column('chunk_index', sa.Integer(), nullable=False),
+        sa.Column('start_char', sa.Integer(), nullable=False),
+        sa.Column('end_char', sa.Integer(), nullable=False),
+        sa.Column('vector_data', Vector(VECTOR_DIM), nullable=True),
+        sa.UniqueConstraint('article_id', 'chunk_index', name='uq_article_chunk_vector_article_id_chunk_index'),
+    )
+
+    # Как и для article_vector: HNSW на pgvector 0.5.0+, иначе IVFFlat
+    version = op.get_bind().execute(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    ).scalar()
+    major, minor = (int(part) for part in version.split('.')[:2])
+    if (major, minor) >= (0, 5):
+        op.execute(
+            "CREATE INDEX ix_article_chunk_vector_vector_data ON article_chunk_vector "
+            "USING hnsw (vector_data vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+        )
+    else:
+        op.execute(
+            "CREATE INDEX ix_article_chunk_vector_vector_data ON article_chunk_vector "
+            "USING ivfflat (vector_data vector_cosine_ops) WITH (lists = 100)"
+        )
+
+def downgrade():
+    op.drop_table('article_chunk_vector')
@@ -0,0 +1,27 @@
+"""add_article_title_index
+
+Revision ID: a7d3e5b9c241
+Revises: f2b7c9d4e018
+Create Date: 2026-10-18 18:40:21.637094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e5b9c241'
+down_revision: Union[str, None] = 'f2b7c9d4e018'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Предзапрос заголовков батча в bulk_upsert_articles и NOT EXISTS в COPY-загрузчике
+    # без индекса превращались в последовательное чтение article на каждый батч.
+    # Индекс не уникальный: в уже загруженных данных заголовки могут повторяться
+    op.create_index(op.f('ix_article_title'), 'article', ['title'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_article_title'), table_name='article')
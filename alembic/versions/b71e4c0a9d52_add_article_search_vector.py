@@ -0,0 +1,36 @@
+"""add_article_search_vector
+
+Revision ID: b71e4c0a9d52
+Revises: 2f6d9b4e7a13
+Create Date: 2026-10-18 14:02:19.553810
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e4c0a9d52'
+down_revision: Union[str, None] = '2f6d9b4e7a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('article', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('russian', left(coalesce(content, ''), 300000)), 'B')",
+            persisted=True
+        )
+    ))
+    op.create_index('ix_article_search_vector', 'article', ['search_vector'], postgresql_using='gin')
+
+def downgrade():
+    op.drop_index('ix_article_search_vector', table_name='article')
+    op.drop_column('article', 'search_vector')
@@ -0,0 +1,44 @@
+"""add_author_tables
+
+Revision ID: c4e8a2d6f913
+Revises: 9e5f1a7c3b20
+Create Date: 2026-10-18 17:26:38.472519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a2d6f913'
+down_revision: Union[str, None] = '9e5f1a7c3b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'author',
+        sa.Column('author_id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('normalized_name', sa.String(length=255), nullable=False),
+        sa.Column('bio', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint('normalized_name'),
+    )
+    op.create_table(
+        'article_author',
+        sa.Column('article_id', sa.Integer(),
+                  sa.ForeignKey('article.article_id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('author_id', sa.Integer(),
+                  sa.ForeignKey('author.author_id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('position', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_article_author_author_id_article_id', 'article_author', ['author_id', 'article_id'])
+    # Связи для уже загруженных статей заполняет scripts/backfill_authors.py
+
+def downgrade():
+    op.drop_table('article_author')
+    op.drop_table('author')
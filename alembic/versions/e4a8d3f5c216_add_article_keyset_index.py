@@ -0,0 +1,26 @@
+"""add_article_keyset_index
+
+Revision ID: e4a8d3f5c216
+Revises: b71e4c0a9d52
+Create Date: 2026-10-18 14:37:51.082664
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a8d3f5c216'
+down_revision: Union[str, None] = 'b71e4c0a9d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Пользователи и авторы листаются по первичному ключу, для них отдельный индекс не нужен
+    op.create_index('ix_article_created_at_article_id', 'article', ['created_at', 'article_id'])
+
+def downgrade():
+    op.drop_index('ix_article_created_at_article_id', table_name='article')
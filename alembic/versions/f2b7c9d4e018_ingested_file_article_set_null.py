@@ -0,0 +1,30 @@
+"""ingested_file_article_set_null
+
+Revision ID: f2b7c9d4e018
+Revises: c4e8a2d6f913
+Create Date: 2026-10-18 18:12:47.905316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7c9d4e018'
+down_revision: Union[str, None] = 'c4e8a2d6f913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Базы, где 5b0e7c1d2a94 уже применена без ON DELETE: иначе удаление
+    # любой загруженной из PDF статьи падает на ссылке из манифеста
+    op.drop_constraint('ingested_file_article_id_fkey', 'ingested_file', type_='foreignkey')
+    op.create_foreign_key('ingested_file_article_id_fkey', 'ingested_file', 'article',
+                          ['article_id'], ['article_id'], ondelete='SET NULL')
+
+def downgrade():
+    op.drop_constraint('ingested_file_article_id_fkey', 'ingested_file', type_='foreignkey')
+    op.create_foreign_key('ingested_file_article_id_fkey', 'ingested_file', 'article',
+                          ['article_id'], ['article_id'])
@@ -0,0 +1,512 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from database import models
+from database.authors import author_key
+from database.cache import entity_cache
+from database.crud import (
+    _decode_cursor, _encode_cursor,
+    _plan_article_upsert, _article_upsert_stmt, _article_content_rows, _article_content_upsert_stmt,
+    _conflicted_hashes, _fill_upsert_results, _mark_same_file,
+    _article_summary_options, _articles_page_stmt, _articles_page_result,
+    _search_articles_stmt, _search_page_result,
+    _add_favorites_stmt, _remove_favorites_stmt, _user_favorites_page_stmt, _user_favorites_page_result,
+    _add_article_author_stmt, _remove_article_author_stmt, _article_authors_stmt,
+    _articles_by_author_stmt, _articles_by_author_result,
+    _articles_without_vectors_stmt, _article_vectors_upsert_stmt, _similar_articles_stmt,
+    CHUNK_INSERT_BATCH, _articles_without_chunks_stmt, _article_chunks_search_stmt, _ef_search_stmt,
+)
+from database.schemas import UserCreate, UserUpdate, ArticleUpdate, AuthorCreate, AuthorUpdate
+
+
+# Запросы строятся теми же хелперами, что и в database.crud, поэтому пагинация,
+# дедупликация и поиск в обеих версиях совпадают. Ленивые загрузки связей
+# в async недоступны: нужные связи подгружаются явно через selectinload
+
+
+async def _first(db: AsyncSession, stmt):
+    return (await db.execute(stmt)).scalars().first()
+
+
+async def _all(db: AsyncSession, stmt):
+    return (await db.execute(stmt)).scalars().all()
+
+
+# ========== User CRUD ==========
+async def create_user(db: AsyncSession, user: UserCreate):
+    db_user = models.User(
+        name=user.name,
+        email=user.email,
+        settings=models.InterfaceSettings(theme="light"),
+        favorites=models.Favorites()
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+
+async def import_users(db: AsyncSession, users: List[UserCreate], batch_size: int = 1000) -> Dict[str, int]:
+    created = 0
+    skipped = 0
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+        now = datetime.utcnow()  # как у default столбца User.created_at
+        rows = list({
+            user.email: {'name': user.name, 'email': user.email, 'created_at': now}
+            for user in batch
+        }.values())
+
+        user_ids = (await db.execute(
+            insert(models.User)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[models.User.email])
+            .returning(models.User.user_id)
+        )).scalars().all()
+
+        if user_ids:
+            await db.execute(insert(models.InterfaceSettings).values(
+                [{'user_id': user_id, 'theme': "light"} for user_id in user_ids]
+            ))
+            await db.execute(insert(models.Favorites).values(
+                [{'user_id': user_id} for user_id in user_ids]
+            ))
+        await db.commit()
+
+        created += len(user_ids)
+        skipped += len(batch) - len(user_ids)
+    return {'created': created, 'skipped': skipped}
+
+
+async def get_user(db: AsyncSession, user_id: int):
+    return await entity_cache.get_or_load_async(
+        db, 'user', user_id,
+        lambda: _first(db, select(models.User).where(models.User.user_id == user_id))
+    )
+
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await _first(db, select(models.User).where(models.User.email == email))
+
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
+    return await _all(db, select(models.User).offset(skip).limit(limit))
+
+
+async def get_users_page(db: AsyncSession, limit: int = 100, cursor: Optional[str] = None):
+    stmt = select(models.User)
+    if cursor:
+        last_id, = _decode_cursor(cursor)
+        stmt = stmt.where(models.User.user_id > last_id)
+    users = await _all(db, stmt.order_by(models.User.user_id).limit(limit + 1))
+    if len(users) > limit:
+        return users[:limit], _encode_cursor(users[limit - 1].user_id)
+    return users, None
+
+
+async def update_user(db: AsyncSession, user_id: int, user: UserUpdate):
+    db_user = await get_user(db, user_id=user_id)
+    if db_user:
+        for var, value in vars(user).items():
+            if value is not None:
+                setattr(db_user, var, value)
+        await db.commit()
+        entity_cache.invalidate('user', user_id)
+        await db.refresh(db_user)
+    return db_user
+
+
+async def delete_user(db: AsyncSession, user_id: int):
+    # Связи 1:1 загружаются заранее: при удалении ORM обнуляет в них user_id
+    db_user = await _first(
+        db,
+        select(models.User)
+        .options(selectinload(models.User.settings), selectinload(models.User.favorites))
+        .where(models.User.user_id == user_id)
+    )
+    if db_user:
+        await db.delete(db_user)
+        await db.commit()
+        entity_cache.invalidate('user', user_id)
+        entity_cache.invalidate('settings', user_id)
+    return db_user
+
+
+# ========== InterfaceSettings CRUD ==========
+async def create_interface_settings(db: AsyncSession, user_id: int, theme: str = "light"):
+    db_settings = models.InterfaceSettings(
+        user_id=user_id,
+        theme=theme
+    )
+    db.add(db_settings)
+    await db.commit()
+    await db.refresh(db_settings)
+    return db_settings
+
+
+async def get_interface_settings(db: AsyncSession, user_id: int):
+    return await entity_cache.get_or_load_async(
+        db, 'settings', user_id,
+        lambda: _first(db, select(models.InterfaceSettings).where(models.InterfaceSettings.user_id == user_id))
+    )
+
+
+async def update_interface_settings(db: AsyncSession, user_id: int, theme: str = None, font_size: int = None,
+                                    language: str = None):
+    db_settings = await get_interface_settings(db, user_id=user_id)
+    if db_settings:
+        if theme is not None:
+            db_settings.theme = theme
+        if font_size is not None:
+            db_settings.font_size = font_size
+        if language is not None:
+            db_settings.language = language
+        await db.commit()
+        entity_cache.invalidate('settings', user_id)
+        await db.refresh(db_settings)
+    return db_settings
+
+
+# ========== Author CRUD ==========
+async def create_author(db: AsyncSession, author: AuthorCreate):
+    db_author = models.Author(
+        name=author.name,
+        normalized_name=author_key(author.name),
+        bio=author.bio
+    )
+    db.add(db_author)
+    await db.commit()
+    await db.refresh(db_author)
+    return db_author
+
+
+async def get_author(db: AsyncSession, author_id: int):
+    return await _first(db, select(models.Author).where(models.Author.author_id == author_id))
+
+
+async def get_author_by_name(db: AsyncSession, name: str):
+    return await _first(db, select(models.Author).where(models.Author.normalized_name == author_key(name)))
+
+
+async def get_authors(db: AsyncSession, skip: int = 0, limit: int = 100):
+    return await _all(db, select(models.Author).offset(skip).limit(limit))
+
+
+async def get_authors_page(db: AsyncSession, limit: int = 100, cursor: Optional[str] = None):
+    stmt = select(models.Author)
+    if cursor:
+        last_id, = _decode_cursor(cursor)
+        stmt = stmt.where(models.Author.author_id > last_id)
+    authors = await _all(db, stmt.order_by(models.Author.author_id).limit(limit + 1))
+    if len(authors) > limit:
+        return authors[:limit], _encode_cursor(authors[limit - 1].author_id)
+    return authors, None
+
+
+async def update_author(db: AsyncSession, author_id: int, author: AuthorUpdate):
+    db_author = await get_author(db, author_id=author_id)
+    if db_author:
+        for var, value in vars(author).items():
+            if value is not None:
+                setattr(db_author, var, value)
+        if author.name is not None:
+            db_author.normalized_name = author_key(author.name)
+        await db.commit()
+        await db.refresh(db_author)
+    return db_author
+
+
+async def delete_author(db: AsyncSession, author_id: int):
+    db_author = await get_author(db, author_id=author_id)
+    if db_author:
+        await db.delete(db_author)
+        await db.commit()
+    return db_author
+
+
+# ========== Article CRUD ==========
+async def create_article(db: AsyncSession, article_data: dict):
+    db_article = models.Article(
+        title=article_data['title'],
+        authors=article_data.get('authors'),
+        body=models.ArticleContent(content=article_data.get('content')),
+        article_url=article_data.get('article_url')
+    )
+    db.add(db_article)
+    await db.commit()
+    await db.refresh(db_article)
+    return db_article
+
+
+async def bulk_upsert_articles(db: AsyncSession, articles: List[dict]) -> List[Tuple[str, Optional[int]]]:
+    """Асинхронный вариант crud.bulk_upsert_articles. Коммит делает вызывающий код"""
+    if not articles:
+        return []
+
+    titles = {article['title'] for article in articles}
+    found = (await db.execute(
+        select(models.Article.title, models.Article.article_id, models.Article.content_hash)
+        .where(models.Article.title.in_(titles))
+    )).all()
+    existing = {title: article_id for title, article_id, _ in found}
+    hash_by_id = {article_id: content_hash for _, article_id, content_hash in found}
+    results, rows, positions_by_key = _plan_article_upsert(articles, existing)
+    if not rows:
+        return _mark_same_file(articles, results, hash_by_id)
+
+    inserted = {}
+    for article_id, title, content_hash in await db.execute(_article_upsert_stmt(rows)):
+        inserted[content_hash or title] = article_id
+    if inserted:
+        await db.execute(insert(models.ArticleContent).values(_article_content_rows(rows, inserted)))
+
+    conflicted = _conflicted_hashes(rows, inserted)
+    conflicted_ids = dict((await db.execute(
+        select(models.Article.content_hash, models.Article.article_id)
+        .where(models.Article.content_hash.in_(conflicted))
+    )).all()) if conflicted else {}
+    hash_by_id.update((article_id, content_hash) for content_hash, article_id in conflicted_ids.items())
+
+    results = _fill_upsert_results(results, rows, positions_by_key, inserted, conflicted_ids)
+    return _mark_same_file(articles, results, hash_by_id)
+
+
+async def get_article(db: AsyncSession, article_id: int):
+    return await entity_cache.get_or_load_async(
+        db, 'article', article_id,
+        lambda: _first(db, select(models.Article).where(models.Article.article_id == article_id))
+    )
+
+
+async def get_articles(db: AsyncSession, skip: int = 0, limit: int = 100):
+    return await _all(db, select(models.Article).offset(skip).limit(limit))
+
+
+async def get_articles_page(db: AsyncSession, limit: int = 100, cursor: Optional[str] = None):
+    stmt = _articles_page_stmt(select(models.Article), limit, cursor)
+    return _articles_page_result(await _all(db, stmt), limit)
+
+
+async def get_article_summaries(db: AsyncSession, skip: int = 0, limit: int = 100):
+    # В async content не догрузится лениво: за текстом нужно идти в get_article_content
+    return await _all(db, select(models.Article).options(_article_summary_options()).offset(skip).limit(limit))
+
+
+async def get_article_summaries_page(db: AsyncSession, limit: int = 100, cursor: Optional[str] = None):
+    stmt = _articles_page_stmt(select(models.Article).options(_article_summary_options()), limit, cursor)
+    return _articles_page_result(await _all(db, stmt), limit)
+
+
+async def get_article_content(db: AsyncSession, article_id: int) -> Optional[str]:
+    return await db.scalar(
+        select(models.ArticleContent.content).where(models.ArticleContent.article_id == article_id)
+    )
+
+
+async def search_articles(db: AsyncSession, query: str, limit: int = 20, cursor: Optional[str] = None):
+    rows = (await db.execute(_search_articles_stmt(query, limit, cursor))).all()
+    return _search_page_result(rows, limit)
+
+
+async def update_article(db: AsyncSession, article_id: int, article: ArticleUpdate):
+    db_article = await get_article(db, article_id=article_id)
+    if db_article:
+        # Новый текст пишется напрямую в article_content: ленивая связь body в async недоступна
+        updates = {var: value for var, value in vars(article).items() if value is not None}
+        content = updates.pop('content', None)
+        for var, value in updates.items():
+            setattr(db_article, var, value)
+        if content is not None:
+            await db.execute(_article_content_upsert_stmt(article_id, content))
+        db_article.updated_at = datetime.now()
+        await db.commit()
+        entity_cache.invalidate('article', article_id)
+        await db.refresh(db_article)
+    return db_article
+
+
+async def delete_article(db: AsyncSession, article_id: int):
+    # Связи загружаются заранее: ORM чистит favorites_articles и обнуляет article_id у вектора
+    db_article = await _first(
+        db,
+        select(models.Article)
+        .options(selectinload(models.Article.in_favorites), selectinload(models.Article.vector))
+        .where(models.Article.article_id == article_id)
+    )
+    if db_article:
+        await db.delete(db_article)
+        await db.commit()
+        entity_cache.invalidate('article', article_id)
+        entity_cache.invalidate('vector', article_id)
+    return db_article
+
+
+# ========== Article-Author M2M CRUD ==========
+async def add_author_to_article(db: AsyncSession, article_id: int, author_id: int):
+    article = await get_article(db, article_id=article_id)
+    if article and await get_author(db, author_id=author_id):
+        await db.execute(_add_article_author_stmt(article_id, author_id))
+        await db.commit()
+    return article
+
+
+async def remove_author_from_article(db: AsyncSession, article_id: int, author_id: int):
+    article = await get_article(db, article_id=article_id)
+    if article:
+        await db.execute(_remove_article_author_stmt(article_id, author_id))
+        await db.commit()
+    return article
+
+
+async def get_article_authors(db: AsyncSession, article_id: int):
+    return await _all(db, _article_authors_stmt(article_id))
+
+
+async def get_articles_by_author(db: AsyncSession, author_id: int, limit: int = 100, cursor: Optional[str] = None):
+    articles = await _all(db, _articles_by_author_stmt(author_id, limit, cursor))
+    return _articles_by_author_result(articles, limit)
+
+
+# ========== Favorites CRUD ==========
+async def create_favorites(db: AsyncSession, user_id: int):
+    db_favorites = models.Favorites(user_id=user_id)
+    db.add(db_favorites)
+    await db.commit()
+    await db.refresh(db_favorites)
+    return db_favorites
+
+
+async def get_favorites(db: AsyncSession, user_id: int):
+    # populate_existing: после add/remove список статей в сессии должен обновиться
+    return await _first(
+        db,
+        select(models.Favorites)
+        .options(selectinload(models.Favorites.articles).options(_article_summary_options()))
+        .where(models.Favorites.user_id == user_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def add_article_to_favorites(db: AsyncSession, user_id: int, article_id: int):
+    await add_articles_to_favorites(db, user_id=user_id, article_ids=[article_id])
+    return await get_favorites(db, user_id=user_id)
+
+
+async def remove_article_from_favorites(db: AsyncSession, user_id: int, article_id: int):
+    await remove_articles_from_favorites(db, user_id=user_id, article_ids=[article_id])
+    return await get_favorites(db, user_id=user_id)
+
+
+async def add_articles_to_favorites(db: AsyncSession, user_id: int, article_ids: List[int]) -> int:
+    if not article_ids:
+        return 0
+    added = (await db.execute(_add_favorites_stmt(user_id, article_ids))).rowcount
+    await db.commit()
+    return added
+
+
+async def remove_articles_from_favorites(db: AsyncSession, user_id: int, article_ids: List[int]) -> int:
+    if not article_ids:
+        return 0
+    removed = (await db.execute(_remove_favorites_stmt(user_id, article_ids))).rowcount
+    await db.commit()
+    return removed
+
+
+async def get_user_favorites(db: AsyncSession, user_id: int):
+    favorites = await get_favorites(db, user_id=user_id)
+    return favorites.articles if favorites else []
+
+
+async def get_user_favorites_page(db: AsyncSession, user_id: int, limit: int = 50, cursor: Optional[str] = None):
+    rows = (await db.execute(_user_favorites_page_stmt(user_id, limit, cursor))).all()
+    return _user_favorites_page_result(rows, limit)
+
+
+# ========== ArticleVector CRUD ==========
+async def create_article_vector(db: AsyncSession, article_id: int, vector_data):
+    db_vector = models.ArticleVector(
+        article_id=article_id,
+        vector_data=vector_data
+    )
+    db.add(db_vector)
+    await db.commit()
+    await db.refresh(db_vector)
+    return db_vector
+
+
+async def get_articles_without_vectors(db: AsyncSession, after_id: int = 0, limit: int = 256,
+                                       max_chars: int = 5000):
+    return (await db.execute(_articles_without_vectors_stmt(after_id, limit, max_chars))).all()
+
+
+async def bulk_upsert_article_vectors(db: AsyncSession, vectors: List[dict], overwrite: bool = False) -> int:
+    if not vectors:
+        return 0
+    if overwrite:
+        entity_cache.invalidate('vector', *(vector['article_id'] for vector in vectors))
+    return (await db.execute(_article_vectors_upsert_stmt(vectors, overwrite))).rowcount
+
+
+async def get_article_vector(db: AsyncSession, article_id: int):
+    return await entity_cache.get_or_load_async(
+        db, 'vector', article_id,
+        lambda: _first(db, select(models.ArticleVector).where(models.ArticleVector.article_id == article_id))
+    )
+
+
+async def update_article_vector(db: AsyncSession, article_id: int, vector_data):
+    db_vector = await get_article_vector(db, article_id=article_id)
+    if db_vector:
+        db_vector.vector_data = vector_data
+        await db.commit()
+        entity_cache.invalidate('vector', article_id)
+        await db.refresh(db_vector)
+    return db_vector
+
+
+async def delete_article_vector(db: AsyncSession, article_id: int):
+    db_vector = await get_article_vector(db, article_id=article_id)
+    if db_vector:
+        await db.delete(db_vector)
+        await db.commit()
+        entity_cache.invalidate('vector', article_id)
+    return db_vector
+
+
+async def find_similar_articles(db: AsyncSession, article_id: Optional[int] = None,
+                                query_vector: Optional[List[float]] = None, k: int = 10):
+    if query_vector is None:
+        if article_id is None:
+            raise ValueError("Нужно передать article_id или query_vector")
+        db_vector = await get_article_vector(db, article_id=article_id)
+        if db_vector is None or db_vector.vector_data is None:
+            return []
+        query_vector = db_vector.vector_data
+    return (await db.execute(_similar_articles_stmt(query_vector, k, article_id))).all()
+
+
+# ========== ArticleChunkVector ==========
+async def get_articles_without_chunks(db: AsyncSession, after_id: int = 0, limit: int = 64,
+                                      max_chars: int = 200000):
+    return (await db.execute(_articles_without_chunks_stmt(after_id, limit, max_chars))).all()
+
+
+async def replace_article_chunk_vectors(db: AsyncSession, article_ids: List[int], chunks: List[dict]) -> int:
+    if article_ids:
+        await db.execute(
+            delete(models.ArticleChunkVector).where(models.ArticleChunkVector.article_id.in_(article_ids))
+        )
+    for start in range(0, len(chunks), CHUNK_INSERT_BATCH):
+        await db.execute(insert(models.ArticleChunkVector).values(chunks[start:start + CHUNK_INSERT_BATCH]))
+    return len(chunks)
+
+
+async def search_article_chunks(db: AsyncSession, query_vector: List[float], k: int = 10, pooling: str = 'max',
+                                candidates: int = 100):
+    stmt = _article_chunks_search_stmt(query_vector, k, pooling, candidates)
+    await db.execute(_ef_search_stmt(candidates))
+    return (await db.execute(stmt)).all()
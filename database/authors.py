@@ -0,0 +1,142 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from database import models
+
+_NAME_PART = re.compile(r"[^\W\d_]+(?:-[^\W\d_]+)*")
+
+
+def split_authors(authors: Optional[str]) -> List[str]:
+    """Разбивает строку авторов из Article.authors ("И.И. Иванов, П.П. Петров")"""
+    return [name.strip() for name in (authors or "").split(",") if name.strip()]
+
+
+def normalize_author_name(name: str) -> Optional[Tuple[str, str]]:
+    """
+    Приводит имя автора к виду "инициалы + фамилия".
+
+    Понимает "И.И. Иванов", "И. И. Иванов", "Иванов И.И." и полные
+    "Иван Иванович Иванов". Возвращает пару (ключ для сравнения, имя для
+    показа), например ("и.и. иванов", "И.И. Иванов"), или None, если
+    фамилию найти не удалось.
+    """
+    parts = _NAME_PART.findall(name)
+    surnames = [part for part in parts if len(part) > 1]
+    if not surnames:
+        return None
+
+    if len(surnames) == len(parts):
+        # Полное имя: фамилия последняя, из остальных частей берутся инициалы
+        surname, given = parts[-1], parts[:-1]
+    else:
+        position = parts.index(surnames[0])
+        surname, given = parts[position], parts[:position] + parts[position + 1:]
+
+    initials = "".join(f"{part[0].upper()}." for part in given)
+    surname = "-".join(piece.capitalize() for piece in surname.split("-"))
+    display = f"{initials} {surname}" if initials else surname
+    return display.lower().replace("ё", "е"), display
+
+
+def author_key(name: str) -> str:
+    """Ключ для author.normalized_name; имена без фамилии (организации) сравниваются целиком"""
+    normalized = normalize_author_name(name)
+    return normalized[0] if normalized else " ".join(name.lower().replace("ё", "е").split())
+
+
+class AuthorResolver:
+    """
+    Сопоставляет имена авторов с записями таблицы author.
+
+    Индекс "нормализованное имя -> author_id" загружается из базы один раз
+    при создании, дальше недостающие авторы батча создаются одним
+    INSERT ... ON CONFLICT DO NOTHING и добавляются в индекс.
+    """
+
+    def __init__(self, db: Session):
+        self.index: Dict[str, int] = {}
+        self.reload(db)
+
+    def reload(self, db: Session) -> None:
+        """Перечитывает индекс, например после отката транзакции с новыми авторами"""
+        self.index = dict(db.execute(select(models.Author.normalized_name, models.Author.author_id)).all())
+
+    def resolve(self, db: Session, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Возвращает author_id для каждого имени, создавая отсутствующих авторов.
+
+        Returns:
+            Словарь "исходное имя -> author_id"; имена без фамилии пропускаются
+        """
+        keys = {}
+        missing = {}
+        for name in names:
+            normalized = normalize_author_name(name)
+            if normalized is None:
+                continue
+            key, display = normalized
+            keys[name] = key
+            if key not in self.index:
+                missing.setdefault(key, display)
+
+        if missing:
+            created = db.execute(
+                insert(models.Author)
+                .values([{'name': display, 'normalized_name': key} for key, display in missing.items()])
+                .on_conflict_do_nothing(index_elements=[models.Author.normalized_name])
+                .returning(models.Author.normalized_name, models.Author.author_id)
+            ).all()
+            self.index.update(created)
+            # Авторы, которых параллельно создал другой процесс
+            conflicted = [key for key in missing if key not in self.index]
+            if conflicted:
+                self.index.update(db.execute(
+                    select(models.Author.normalized_name, models.Author.author_id)
+                    .where(models.Author.normalized_name.in_(conflicted))
+                ).all())
+
+        return {name: self.index[key] for name, key in keys.items()}
+
+    def link_articles(self, db: Session, articles: Iterable[Tuple[int, Optional[str]]],
+                      replace: bool = False) -> int:
+        """
+        Связывает статьи с авторами из строки Article.authors.
+
+        Все имена батча разрешаются одним вызовом resolve, связи пишутся
+        одним INSERT. При replace=True старые связи этих статей удаляются.
+        Коммит делает вызывающий код.
+
+        Args:
+            articles: Пары (article_id, строка авторов)
+
+        Returns:
+            Количество созданных связей
+        """
+        articles = [(article_id, split_authors(authors)) for article_id, authors in articles]
+        if replace and articles:
+            db.execute(delete(models.ArticleAuthor).where(
+                models.ArticleAuthor.article_id.in_([article_id for article_id, _ in articles])
+            ))
+
+        author_ids = self.resolve(db, (name for _, names in articles for name in names))
+        links = {}
+        for article_id, names in articles:
+            for position, name in enumerate(names):
+                author_id = author_ids.get(name)
+                if author_id is not None:
+                    links.setdefault((article_id, author_id), position)
+        if not links:
+            return 0
+
+        return db.execute(
+            insert(models.ArticleAuthor)
+            .values([
+                {'article_id': article_id, 'author_id': author_id, 'position': position}
+                for (article_id, author_id), position in links.items()
+            ])
+            .on_conflict_do_nothing(index_elements=[models.ArticleAuthor.article_id, models.ArticleAuthor.author_id])
+        ).rowcount
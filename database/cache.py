@@ -0,0 +1,197 @@
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, identity_key
+
+DEFAULT_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", "10000"))
+DEFAULT_CACHE_TTL = float(os.getenv("ENTITY_CACHE_TTL", "300"))
+
+
+class CacheBackend:
+    """Интерфейс хранилища кеша: ключ - строка, значение - байты"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """Кеш в памяти процесса с вытеснением по LRU и временем жизни записей"""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache(CacheBackend):
+    """Общий кеш для нескольких процессов поверх клиента redis-py"""
+
+    def __init__(self, client, ttl: float = DEFAULT_CACHE_TTL, prefix: str = "uniback:entity:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(self.prefix + key, value, px=int(self.ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+class EntityCache:
+    """
+    Read-through кеш ORM-объектов поверх CacheBackend.
+
+    Объект хранится сериализованным через pickle, а при попадании
+    присоединяется к сессии вызывающего кода через merge(load=False),
+    без запроса к базе. Если объект уже есть в сессии, возвращается он
+    сам, как и при обычном запросе. Функции crud, изменяющие данные,
+    вызывают invalidate после коммита.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend]):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+        self.invalidations: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def _key(entity: str, entity_id) -> str:
+        return f"{entity}:{entity_id}"
+
+    @staticmethod
+    def _in_session(identity_map, obj):
+        # merge(load=False) переписал бы еще не закоммиченные изменения объекта в сессии
+        return identity_map.get(identity_key(instance=obj))
+
+    @staticmethod
+    def _cacheable(obj) -> bool:
+        # loader мог вернуть объект из identity map сессии с незакоммиченными изменениями
+        # (modified - объект из db.dirty, pending - из db.new): в общий кеш он не попадает,
+        # иначе другие сессии прочитают данные, которые могут откатиться, а merge(load=False)
+        # такого объекта падает с InvalidRequestError
+        state = inspect(obj)
+        return not state.modified and not state.pending
+
+    def get_or_load(self, db: Session, entity: str, entity_id, loader: Callable):
+        if self.backend is None:
+            return loader()
+
+        data = self.backend.get(self._key(entity, entity_id))
+        if data is not None:
+            with self._lock:
+                self.hits[entity] += 1
+            obj = pickle.loads(data)
+            current = self._in_session(db.identity_map, obj)
+            return current if current is not None else db.merge(obj, load=False)
+
+        with self._lock:
+            self.misses[entity] += 1
+        obj = loader()
+        if obj is not None and self._cacheable(obj):
+            self.backend.set(self._key(entity, entity_id), pickle.dumps(obj))
+        return obj
+
+    async def get_or_load_async(self, db, entity: str, entity_id, loader: Callable):
+        """То же, что get_or_load, для AsyncSession и асинхронного loader"""
+        if self.backend is None:
+            return await loader()
+
+        data = self.backend.get(self._key(entity, entity_id))
+        if data is not None:
+            with self._lock:
+                self.hits[entity] += 1
+            obj = pickle.loads(data)
+            current = self._in_session(db.identity_map, obj)
+            return current if current is not None else await db.merge(obj, load=False)
+
+        with self._lock:
+            self.misses[entity] += 1
+        obj = await loader()
+        if obj is not None and self._cacheable(obj):
+            self.backend.set(self._key(entity, entity_id), pickle.dumps(obj))
+        return obj
+
+    def invalidate(self, entity: str, *entity_ids) -> None:
+        if self.backend is None:
+            return
+        for entity_id in entity_ids:
+            self.backend.delete(self._key(entity, entity_id))
+        with self._lock:
+            self.invalidations[entity] += len(entity_ids)
+
+    def clear(self) -> None:
+        """Сбрасывает весь кеш, например после массовой очистки таблиц"""
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        """Счетчики попаданий, промахов и инвалидаций по типам сущностей"""
+        with self._lock:
+            entities = set(self.hits) | set(self.misses) | set(self.invalidations)
+            return {
+                entity: {
+                    'hits': self.hits[entity],
+                    'misses': self.misses[entity],
+                    'invalidations': self.invalidations[entity],
+                }
+                for entity in sorted(entities)
+            }
+
+
+entity_cache = EntityCache(LRUCache())
+
+
+def configure_cache(backend: Optional[CacheBackend]) -> None:
+    """Заменяет хранилище кеша; None полностью отключает кеширование"""
+    entity_cache.backend = backend
@@ -1,22 +1,153 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from sqlalchemy.orm import Session, sessionmaker
 import os
+import threading
+from database.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, pool_stats
 
-load_dotenv()
+# Движки создаются при первом обращении, а не при импорте: скрипты и воркеры,
+# которым не нужна база, не платят за чтение .env и создание пула
+_lock = threading.Lock()
+_settings_loaded = False
+_engine = None
+_async_engine = None
+_async_sessionmaker = None
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL not found in .env file")
 
-# Добавляем параметры для пула соединений
-engine = create_engine(
-    DATABASE_URL,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True  # Проверка соединения перед использованием
-)
+def _load_settings() -> None:
+    global _settings_loaded
+    if not _settings_loaded:
+        from dotenv import load_dotenv
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+        load_dotenv()
+        _settings_loaded = True
+
+
+def get_database_url() -> str:
+    _load_settings()
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise ValueError("DATABASE_URL not found in .env file")
+    return database_url
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_pool_settings() -> dict:
+    """Параметры пула соединений, общие для синхронного и асинхронного движков"""
+    _load_settings()
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        # Соединения старше этого числа секунд переоткрываются; -1 отключает
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),  # Проверка соединения перед использованием
+    }
+
+
+def get_engine():
+    """Синхронный движок процесса, создается при первом вызове"""
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = create_engine(
+                    get_database_url(),
+                    poolclass=InstrumentedQueuePool,
+                    **get_pool_settings()
+                )
+    return _engine
+
+
+def _dispose_after_fork() -> None:
+    # Дочерний процесс не должен пользоваться соединениями родителя:
+    # пул отбрасывается без закрытия сокетов, которые остаются за родителем
+    global _lock
+    _lock = threading.Lock()
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+class _LazyBindSession(Session):
+    """Сессия, которая берет движок при создании, а не при импорте модуля"""
+
+    def __init__(self, bind=None, **kwargs):
+        super().__init__(bind=bind if bind is not None else get_engine(), **kwargs)
+
+
+SessionLocal = sessionmaker(class_=_LazyBindSession, autocommit=False, autoflush=False)
+Base = declarative_base()
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_pool_stats() -> dict:
+    """Загрузка пула синхронного движка: занятые соединения, overflow и время ожидания"""
+    return pool_stats(get_engine().pool)
+
+
+def __getattr__(name):
+    # Совместимость со старым кодом: config.engine и config.DATABASE_URL
+    if name == "engine":
+        return get_engine()
+    if name == "DATABASE_URL":
+        return get_database_url()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ========== Асинхронный движок (asyncpg) ==========
+def get_async_engine():
+    """Создает асинхронный движок при первом обращении, чтобы asyncpg был нужен только async-коду"""
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        url = make_url(get_database_url()).set(drivername="postgresql+asyncpg")
+        connect_args = {}
+        # asyncpg не понимает sslmode из строки подключения libpq, передаем его как ssl
+        sslmode = url.query.get("sslmode")
+        if sslmode:
+            url = url.difference_update_query(["sslmode"])
+            connect_args["ssl"] = sslmode
+
+        _async_engine = create_async_engine(
+            url,
+            poolclass=InstrumentedAsyncQueuePool,
+            connect_args=connect_args,
+            **get_pool_settings()
+        )
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        # expire_on_commit=False: в async нельзя лениво дочитывать атрибуты после коммита
+        _async_sessionmaker = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as session:
+        yield session
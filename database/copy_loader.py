@@ -0,0 +1,183 @@
+from datetime import datetime
+from itertools import count
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import models
+from database.crud import _mark_same_file
+
+# Размер блока, которым psycopg2 читает поток для COPY
+COPY_BUFFER_SIZE = 1024 * 1024
+
+STAGE_COLUMNS = (
+    'ord', 'title', 'authors', 'content', 'article_url',
+    'content_hash', 'created_at', 'updated_at'
+)
+
+CREATE_STAGE_SQL = """
+    DROP TABLE IF EXISTS pg_temp.article_stage;
+    CREATE TEMP TABLE article_stage (
+        ord bigint NOT NULL,
+        title varchar(255) NOT NULL,
+        authors text,
+        content text,
+        article_url varchar(512),
+        content_hash varchar(64),
+        created_at timestamptz,
+        updated_at timestamptz
+    ) ON COMMIT DROP;
+"""
+
+# Та же логика, что и в crud.bulk_upsert_articles: первая строка на каждый
+# хеш и заголовок, без заголовков, уже существующих в таблице (NOT EXISTS идет
+# по ix_article_title). Как и там, от параллельных загрузчиков защищает только
+# ON CONFLICT по content_hash, а не проверка заголовка
+MERGE_SQL = """
+    INSERT INTO article (title, authors, article_url, content_hash, created_at, updated_at)
+    SELECT title, authors, article_url, content_hash, created_at, updated_at
+    FROM (
+        SELECT DISTINCT ON (title) *
+        FROM (
+            SELECT DISTINCT ON (coalesce(content_hash, title)) *
+            FROM article_stage
+            ORDER BY coalesce(content_hash, title), ord
+        ) AS by_hash
+        ORDER BY title, ord
+    ) AS s
+    WHERE NOT EXISTS (SELECT 1 FROM article AS a WHERE a.title = s.title)
+    ORDER BY ord
+    ON CONFLICT (content_hash) DO NOTHING
+    RETURNING article_id, title, content_hash
+"""
+
+
+# Тексты вставленных статей переносятся из stage отдельным запросом: триггер
+# search_vector на article_content должен видеть уже вставленный заголовок
+CONTENT_SQL = """
+    INSERT INTO article_content (article_id, content)
+    SELECT DISTINCT ON (i.article_id) i.article_id, s.content
+    FROM unnest(CAST(:article_ids AS integer[]), CAST(:keys AS text[])) AS i (article_id, key)
+    JOIN article_stage AS s ON coalesce(s.content_hash, s.title) = i.key
+    ORDER BY i.article_id, s.ord
+"""
+
+
+class _StreamReader:
+    """Файлоподобный объект, отдающий COPY данные из итератора строк по мере чтения"""
+
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self._buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk.encode('utf-8')
+
+        if size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+
+def _csv_field(value) -> str:
+    # В CSV-формате COPY пустое поле без кавычек - это NULL, а строка в кавычках - текст
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, int):
+        return str(value)
+    # PostgreSQL не хранит NUL-символы в text, а pdfplumber иногда их возвращает
+    return '"' + str(value).replace('\x00', '').replace('"', '""') + '"'
+
+
+def _iter_csv_rows(articles: Iterable[dict], keys: List[Tuple[str, Optional[str]]]) -> Iterator[str]:
+    now = datetime.now()
+    for ord_, article in zip(count(), articles):
+        keys.append((article['title'], article.get('content_hash')))
+        row = (
+            ord_,
+            article['title'],
+            article.get('authors'),
+            article.get('content'),
+            article.get('article_url'),
+            article.get('content_hash'),
+            article.get('created_at') or now,
+            article.get('updated_at') or now,
+        )
+        yield ','.join(_csv_field(value) for value in row) + '\n'
+
+
+def copy_articles(db: Session, articles: Iterable[dict]) -> List[Tuple[str, Optional[int]]]:
+    """
+    Загружает статьи через COPY FROM STDIN во временную таблицу и сливает их в article
+    и article_content.
+
+    Статьи читаются из итератора по мере отправки, поэтому в памяти не
+    держится весь набор текстов. Результат совпадает по формату с
+    crud.bulk_upsert_articles. Коммит делает вызывающий код.
+
+    Args:
+        db: Сессия SQLAlchemy
+        articles: Словари с ключами title, authors, content, article_url,
+            content_hash и, опционально, created_at/updated_at
+
+    Returns:
+        Для каждой входной статьи пару (статус, article_id), где статус
+        'inserted', 'existing' или 'duplicate'
+    """
+    keys: List[Tuple[str, Optional[str]]] = []
+
+    db.execute(text(CREATE_STAGE_SQL))
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY article_stage ({', '.join(STAGE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            _StreamReader(_iter_csv_rows(articles, keys)),
+            size=COPY_BUFFER_SIZE,
+        )
+    finally:
+        cursor.close()
+
+    inserted = {}
+    for article_id, title, content_hash in db.execute(text(MERGE_SQL)):
+        inserted[content_hash or title] = article_id
+    if inserted:
+        db.execute(text(CONTENT_SQL), {'article_ids': list(inserted.values()), 'keys': list(inserted)})
+
+    # Для пропущенных строк находим уже существующие статьи двумя запросами
+    missing = [(title, content_hash) for title, content_hash in keys
+               if (content_hash or title) not in inserted]
+    ids_by_hash = dict(
+        db.query(models.Article.content_hash, models.Article.article_id)
+        .filter(models.Article.content_hash.in_({h for _, h in missing if h}))
+        .all()
+    ) if missing else {}
+    by_title = (
+        db.query(models.Article.title, models.Article.article_id, models.Article.content_hash)
+        .filter(models.Article.title.in_({t for t, _ in missing}))
+        .all()
+    ) if missing else []
+    ids_by_title = {title: article_id for title, article_id, _ in by_title}
+    hash_by_id = {article_id: content_hash for _, article_id, content_hash in by_title}
+    hash_by_id.update((article_id, content_hash) for content_hash, article_id in ids_by_hash.items())
+
+    results = []
+    claimed = set()
+    for title, content_hash in keys:
+        key = content_hash or title
+        if key in inserted and key not in claimed:
+            claimed.add(key)
+            results.append(('inserted', inserted[key]))
+        else:
+            article_id = inserted.get(key) or ids_by_hash.get(content_hash) or ids_by_title.get(title)
+            results.append(('duplicate', article_id))
+    return _mark_same_file([{'content_hash': content_hash} for _, content_hash in keys], results, hash_by_id)
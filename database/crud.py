@@ -1,30 +1,82 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import Float, and_, or_, cast, delete, exists, func, select, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg, insert
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+import base64
+import json
 from database import models
+from database.authors import author_key
+from database.cache import entity_cache
 from database.schemas import UserCreate, UserUpdate, ArticleCreate, ArticleUpdate, AuthorCreate, AuthorUpdate
 
 
+# ========== Курсоры для постраничной выдачи ==========
+def _encode_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError("Некорректный курсор")
+
+
 # ========== User CRUD ==========
 def create_user(db: Session, user: UserCreate):
+    # Пользователь, настройки и избранное (1:1) создаются одним flush в одной транзакции
     db_user = models.User(
         name=user.name,
-        email=user.email
+        email=user.email,
+        settings=models.InterfaceSettings(theme="light"),
+        favorites=models.Favorites()
     )
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    return db_user
 
-    # Создаем связанные записи (1:1)
-    create_interface_settings(db, user_id=db_user.user_id)
-    create_favorites(db, user_id=db_user.user_id)
 
-    return db_user
+def import_users(db: Session, users: List[UserCreate], batch_size: int = 1000) -> Dict[str, int]:
+    # Массовый перенос пользователей: на батч три INSERT (пользователи, настройки, избранное)
+    # и один коммит. Пользователи с уже существующим email пропускаются
+    created = 0
+    skipped = 0
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+        now = datetime.utcnow()  # как у default столбца User.created_at
+        rows = list({
+            user.email: {'name': user.name, 'email': user.email, 'created_at': now}
+            for user in batch
+        }.values())
+
+        user_ids = db.execute(
+            insert(models.User)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[models.User.email])
+            .returning(models.User.user_id)
+        ).scalars().all()
+
+        if user_ids:
+            db.execute(insert(models.InterfaceSettings).values(
+                [{'user_id': user_id, 'theme': "light"} for user_id in user_ids]
+            ))
+            db.execute(insert(models.Favorites).values(
+                [{'user_id': user_id} for user_id in user_ids]
+            ))
+        db.commit()
+
+        created += len(user_ids)
+        skipped += len(batch) - len(user_ids)
+    return {'created': created, 'skipped': skipped}
 
 
 def get_user(db: Session, user_id: int):
-    return db.query(models.User).filter(models.User.user_id == user_id).first()
+    return entity_cache.get_or_load(
+        db, 'user', user_id,
+        lambda: db.query(models.User).filter(models.User.user_id == user_id).first()
+    )
 
 
 def get_user_by_email(db: Session, email: str):
@@ -35,6 +87,18 @@ def get_users(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.User).offset(skip).limit(limit).all()
 
 
+def get_users_page(db: Session, limit: int = 100, cursor: Optional[str] = None):
+    # Keyset-пагинация по первичному ключу: любая страница стоит как первая
+    query = db.query(models.User)
+    if cursor:
+        last_id, = _decode_cursor(cursor)
+        query = query.filter(models.User.user_id > last_id)
+    users = query.order_by(models.User.user_id).limit(limit + 1).all()
+    if len(users) > limit:
+        return users[:limit], _encode_cursor(users[limit - 1].user_id)
+    return users, None
+
+
 def update_user(db: Session, user_id: int, user: UserUpdate):
     db_user = get_user(db, user_id=user_id)
     if db_user:
@@ -42,6 +106,7 @@ def update_user(db: Session, user_id: int, user: UserUpdate):
             if value is not None:
                 setattr(db_user, var, value)
         db.commit()
+        entity_cache.invalidate('user', user_id)
         db.refresh(db_user)
     return db_user
 
@@ -51,6 +116,8 @@ def delete_user(db: Session, user_id: int):
     if db_user:
         db.delete(db_user)
         db.commit()
+        entity_cache.invalidate('user', user_id)
+        entity_cache.invalidate('settings', user_id)
     return db_user
 
 
@@ -67,7 +134,10 @@ def create_interface_settings(db: Session, user_id: int, theme: str = "light"):
 
 
 def get_interface_settings(db: Session, user_id: int):
-    return db.query(models.InterfaceSettings).filter(models.InterfaceSettings.user_id == user_id).first()
+    return entity_cache.get_or_load(
+        db, 'settings', user_id,
+        lambda: db.query(models.InterfaceSettings).filter(models.InterfaceSettings.user_id == user_id).first()
+    )
 
 
 def update_interface_settings(db: Session, user_id: int, theme: str = None, font_size: int = None,
@@ -81,6 +151,7 @@ def update_interface_settings(db: Session, user_id: int, theme: str = None, font
         if language is not None:
             db_settings.language = language
         db.commit()
+        entity_cache.invalidate('settings', user_id)
         db.refresh(db_settings)
     return db_settings
 
@@ -89,6 +160,7 @@ def update_interface_settings(db: Session, user_id: int, theme: str = None, font
 def create_author(db: Session, author: AuthorCreate):
     db_author = models.Author(
         name=author.name,
+        normalized_name=author_key(author.name),
         bio=author.bio
     )
     db.add(db_author)
@@ -101,16 +173,34 @@ def get_author(db: Session, author_id: int):
     return db.query(models.Author).filter(models.Author.author_id == author_id).first()
 
 
+def get_author_by_name(db: Session, name: str):
+    # "Иванов И.И." и "И. И. Иванов" находят одного автора по уникальному индексу
+    return db.query(models.Author).filter(models.Author.normalized_name == author_key(name)).first()
+
+
 def get_authors(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.Author).offset(skip).limit(limit).all()
 
 
+def get_authors_page(db: Session, limit: int = 100, cursor: Optional[str] = None):
+    query = db.query(models.Author)
+    if cursor:
+        last_id, = _decode_cursor(cursor)
+        query = query.filter(models.Author.author_id > last_id)
+    authors = query.order_by(models.Author.author_id).limit(limit + 1).all()
+    if len(authors) > limit:
+        return authors[:limit], _encode_cursor(authors[limit - 1].author_id)
+    return authors, None
+
+
 def update_author(db: Session, author_id: int, author: AuthorUpdate):
     db_author = get_author(db, author_id=author_id)
     if db_author:
         for var, value in vars(author).items():
             if value is not None:
                 setattr(db_author, var, value)
+        if author.name is not None:
+            db_author.normalized_name = author_key(author.name)
         db.commit()
         db.refresh(db_author)
     return db_author
@@ -129,7 +219,9 @@ def create_article(db: Session, article_data: dict):
     db_article = models.Article(
         title=article_data['title'],
         authors=article_data.get('authors'),
-        content=article_data.get('content'),
+        # Строка article_content создается и без текста: прокси content на None ничего не делает,
+        # а без этой строки статья не найдется поиском даже по заголовку
+        body=models.ArticleContent(content=article_data.get('content')),
         article_url=article_data.get('article_url')  # Новое поле
     )
     db.add(db_article)
@@ -138,22 +230,272 @@ def create_article(db: Session, article_data: dict):
     return db_article
 
 
+def _plan_article_upsert(articles: List[dict], existing: Dict[str, int]):
+    # Отсекает статьи с существующими заголовками и дубли внутри батча.
+    # Возвращает (результаты по позициям, строки для INSERT, позиции каждой строки по ключу)
+    results: List[Tuple[str, Optional[int]]] = [('duplicate', None)] * len(articles)
+    rows = []
+    positions_by_key = {}  # ключ вставляемой строки -> позиции во входном списке
+    key_by_title = {}
+    for position, article in enumerate(articles):
+        title = article['title']
+        if title in existing:
+            results[position] = ('duplicate', existing[title])
+            continue
+
+        # Дубль внутри батча: тот же файл или тот же заголовок
+        key = article.get('content_hash') or title
+        if key not in positions_by_key:
+            key = key_by_title.get(title, key)
+        if key in positions_by_key:
+            positions_by_key[key].append(position)
+            continue
+
+        now = datetime.now()
+        rows.append({
+            'title': title,
+            'authors': article.get('authors'),
+            'content': article.get('content'),
+            'article_url': article.get('article_url'),
+            'content_hash': article.get('content_hash'),
+            'created_at': article.get('created_at') or now,
+            'updated_at': article.get('updated_at') or now,
+        })
+        positions_by_key[key] = [position]
+        key_by_title[title] = key
+    return results, rows, positions_by_key
+
+
+def _article_upsert_stmt(rows: List[dict]):
+    # Текст пишется отдельно в article_content, см. _article_content_rows
+    return (
+        insert(models.Article)
+        .values([{key: value for key, value in row.items() if key != 'content'} for row in rows])
+        .on_conflict_do_nothing(index_elements=[models.Article.content_hash])
+        .returning(models.Article.article_id, models.Article.title, models.Article.content_hash)
+    )
+
+
+def _article_content_rows(rows: List[dict], inserted: Dict[str, int]) -> List[dict]:
+    # Строка article_content создается для каждой новой статьи, даже без текста:
+    # в ней хранится search_vector, по которому статья ищется и по заголовку
+    return [
+        {'article_id': inserted[row['content_hash'] or row['title']], 'content': row['content']}
+        for row in rows if (row['content_hash'] or row['title']) in inserted
+    ]
+
+
+def _article_content_upsert_stmt(article_id: int, content: Optional[str]):
+    stmt = insert(models.ArticleContent).values(article_id=article_id, content=content)
+    return stmt.on_conflict_do_update(
+        index_elements=[models.ArticleContent.article_id],
+        set_={'content': stmt.excluded.content}
+    )
+
+
+def _conflicted_hashes(rows: List[dict], inserted: Dict[str, int]) -> List[str]:
+    # Строки, отброшенные ON CONFLICT, ссылаются на уже существующие статьи
+    return [row['content_hash'] for row in rows if (row['content_hash'] or row['title']) not in inserted]
+
+
+def _fill_upsert_results(results, rows, positions_by_key, inserted: Dict[str, int],
+                         conflicted_ids: Dict[str, int]) -> List[Tuple[str, Optional[int]]]:
+    for row in rows:
+        key = row['content_hash'] or row['title']
+        positions = positions_by_key[key]
+        if key in inserted:
+            results[positions[0]] = ('inserted', inserted[key])
+            duplicates = positions[1:]
+            article_id = inserted[key]
+        else:
+            duplicates = positions
+            article_id = conflicted_ids.get(row['content_hash'])
+        for position in duplicates:
+            results[position] = ('duplicate', article_id)
+    return results
+
+
+def _mark_same_file(articles: List[dict], results, hash_by_id: Dict[int, Optional[str]]):
+    # Статья, загруженная раньше из того же файла (повторный запуск с --force), - не дубль:
+    # запись манифеста этого файла должна остаться в статусе ingested
+    for position, (status, article_id) in enumerate(results):
+        content_hash = articles[position].get('content_hash')
+        if status == 'duplicate' and content_hash and hash_by_id.get(article_id) == content_hash:
+            results[position] = ('existing', article_id)
+    return results
+
+
+def bulk_upsert_articles(db: Session, articles: List[dict]) -> List[Tuple[str, Optional[int]]]:
+    """
+    Групповая вставка статей с защитой от дублей на стороне БД.
+
+    Существующие заголовки батча выбираются одним запросом, дубли внутри
+    батча отсекаются в памяти, а вставка идет одним INSERT ... ON CONFLICT
+    по content_hash. Между параллельными загрузчиками гарантирована только
+    уникальность content_hash: одинаковый заголовок из разных файлов,
+    пришедший одновременно, может быть вставлен дважды, так как проверка
+    заголовка (по индексу ix_article_title) идет до INSERT.
+    Тексты новых статей записываются вторым INSERT в article_content.
+    Коммит делает вызывающий код.
+
+    Returns:
+        Для каждой входной статьи пару (статус, article_id), где статус
+        'inserted', 'existing' (статья уже загружена из файла с тем же
+        content_hash) или 'duplicate', а article_id - новая или уже существующая статья
+    """
+    if not articles:
+        return []
+
+    titles = {article['title'] for article in articles}
+    found = (
+        db.query(models.Article.title, models.Article.article_id, models.Article.content_hash)
+        .filter(models.Article.title.in_(titles))
+        .all()
+    )
+    existing = {title: article_id for title, article_id, _ in found}
+    hash_by_id = {article_id: content_hash for _, article_id, content_hash in found}
+    results, rows, positions_by_key = _plan_article_upsert(articles, existing)
+    if not rows:
+        return _mark_same_file(articles, results, hash_by_id)
+
+    inserted = {}
+    for article_id, title, content_hash in db.execute(_article_upsert_stmt(rows)):
+        inserted[content_hash or title] = article_id
+    if inserted:
+        db.execute(insert(models.ArticleContent).values(_article_content_rows(rows, inserted)))
+
+    conflicted = _conflicted_hashes(rows, inserted)
+    conflicted_ids = dict(
+        db.query(models.Article.content_hash, models.Article.article_id)
+        .filter(models.Article.content_hash.in_(conflicted))
+        .all()
+    ) if conflicted else {}
+    hash_by_id.update((article_id, content_hash) for content_hash, article_id in conflicted_ids.items())
+
+    results = _fill_upsert_results(results, rows, positions_by_key, inserted, conflicted_ids)
+    return _mark_same_file(articles, results, hash_by_id)
+
+
 def get_article(db: Session, article_id: int):
-    return db.query(models.Article).filter(models.Article.article_id == article_id).first()
+    return entity_cache.get_or_load(
+        db, 'article', article_id,
+        lambda: db.query(models.Article).filter(models.Article.article_id == article_id).first()
+    )
 
 
 def get_articles(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.Article).offset(skip).limit(limit).all()
 
 
+def _article_summary_options():
+    # Для списков хватает метаданных, content_hash не нужен
+    return load_only(
+        models.Article.title,
+        models.Article.authors,
+        models.Article.article_url,
+        models.Article.created_at,
+        models.Article.updated_at,
+    )
+
+
+def _articles_page_stmt(stmt, limit: int, cursor: Optional[str]):
+    # Keyset-пагинация по (created_at, article_id) с индексом ix_article_created_at_article_id:
+    # страницы не сдвигаются, когда во время загрузки добавляются новые статьи
+    if cursor:
+        last_created_at, last_id = _decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(models.Article.created_at, models.Article.article_id)
+            > tuple_(datetime.fromisoformat(last_created_at), last_id)
+        )
+    return stmt.order_by(models.Article.created_at, models.Article.article_id).limit(limit + 1)
+
+
+def _articles_page_result(articles: list, limit: int):
+    if len(articles) > limit:
+        last = articles[limit - 1]
+        return articles[:limit], _encode_cursor(last.created_at.isoformat(), last.article_id)
+    return articles, None
+
+
+def get_articles_page(db: Session, limit: int = 100, cursor: Optional[str] = None):
+    stmt = _articles_page_stmt(select(models.Article), limit, cursor)
+    return _articles_page_result(db.execute(stmt).scalars().all(), limit)
+
+
+def get_article_summaries(db: Session, skip: int = 0, limit: int = 100):
+    # Списки статей без текста; content подгрузится из article_content при обращении к атрибуту
+    return db.query(models.Article).options(_article_summary_options()).offset(skip).limit(limit).all()
+
+
+def get_article_summaries_page(db: Session, limit: int = 100, cursor: Optional[str] = None):
+    stmt = _articles_page_stmt(select(models.Article).options(_article_summary_options()), limit, cursor)
+    return _articles_page_result(db.execute(stmt).scalars().all(), limit)
+
+
+def get_article_content(db: Session, article_id: int) -> Optional[str]:
+    return db.query(models.ArticleContent.content).filter(models.ArticleContent.article_id == article_id).scalar()
+
+
+def _search_articles_stmt(query: str, limit: int, cursor: Optional[str]):
+    tsquery = func.websearch_to_tsquery(models.SEARCH_CONFIG, query)
+    # ts_rank_cd возвращает real: курсор хранит ранг как float8, и без приведения
+    # сравнение rank == last_rank на границе страницы не совпадало бы никогда
+    rank = cast(func.ts_rank_cd(models.ArticleContent.search_vector, tsquery), Float(53))
+
+    ranked = (
+        select(models.Article.article_id, models.Article.title, models.Article.authors, rank.label('rank'))
+        .join(models.ArticleContent, models.ArticleContent.article_id == models.Article.article_id)
+        .where(models.ArticleContent.search_vector.op('@@')(tsquery))
+    )
+    if cursor:
+        last_rank, last_id = _decode_cursor(cursor)
+        ranked = ranked.where(or_(
+            rank < last_rank,
+            and_(rank == last_rank, models.Article.article_id > last_id)
+        ))
+    ranked = ranked.order_by(rank.desc(), models.Article.article_id).limit(limit + 1).subquery()
+
+    # Сниппеты считаются только для строк текущей страницы
+    snippet = func.ts_headline(
+        models.SEARCH_CONFIG,
+        func.left(models.ArticleContent.content, models.SEARCH_CONTENT_CHARS),
+        tsquery,
+        'MaxFragments=2, MaxWords=30, MinWords=10'
+    )
+    return (
+        select(ranked.c.article_id, ranked.c.title, ranked.c.authors, ranked.c.rank, snippet.label('snippet'))
+        .join(models.ArticleContent, models.ArticleContent.article_id == ranked.c.article_id)
+        .order_by(ranked.c.rank.desc(), ranked.c.article_id)
+    )
+
+
+def _search_page_result(rows: list, limit: int):
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, _encode_cursor(rows[-1].rank, rows[-1].article_id)
+    return rows, None
+
+
+def search_articles(db: Session, query: str, limit: int = 20, cursor: Optional[str] = None):
+    # Полнотекстовый поиск по GIN-индексу article_content.search_vector: заголовок весит больше текста.
+    # Возвращает (результаты, курсор следующей страницы или None)
+    rows = db.execute(_search_articles_stmt(query, limit, cursor)).all()
+    return _search_page_result(rows, limit)
+
+
 def update_article(db: Session, article_id: int, article: ArticleUpdate):
     db_article = get_article(db, article_id=article_id)
     if db_article:
-        for var, value in vars(article).items():
-            if value is not None:
-                setattr(db_article, var, value)
+        # Новый текст пишется напрямую в article_content, без загрузки старого
+        updates = {var: value for var, value in vars(article).items() if value is not None}
+        content = updates.pop('content', None)
+        for var, value in updates.items():
+            setattr(db_article, var, value)
+        if content is not None:
+            db.execute(_article_content_upsert_stmt(article_id, content))
         db_article.updated_at = datetime.now()
         db.commit()
+        entity_cache.invalidate('article', article_id)
         db.refresh(db_article)
     return db_article
 
@@ -163,30 +505,87 @@ def delete_article(db: Session, article_id: int):
     if db_article:
         db.delete(db_article)
         db.commit()
+        entity_cache.invalidate('article', article_id)
+        entity_cache.invalidate('vector', article_id)
     return db_article
 
 
 # ========== Article-Author M2M CRUD ==========
+def _add_article_author_stmt(article_id: int, author_id: int):
+    # Новый автор встает в конец списка авторов статьи
+    next_position = (
+        select(func.coalesce(func.max(models.ArticleAuthor.position) + 1, 0))
+        .where(models.ArticleAuthor.article_id == article_id)
+        .scalar_subquery()
+    )
+    return insert(models.ArticleAuthor).values(
+        article_id=article_id, author_id=author_id, position=next_position
+    ).on_conflict_do_nothing(index_elements=[models.ArticleAuthor.article_id, models.ArticleAuthor.author_id])
+
+
+def _remove_article_author_stmt(article_id: int, author_id: int):
+    return delete(models.ArticleAuthor).where(
+        models.ArticleAuthor.article_id == article_id,
+        models.ArticleAuthor.author_id == author_id
+    )
+
+
 def add_author_to_article(db: Session, article_id: int, author_id: int):
+    # Связь пишется одним INSERT, без загрузки списков авторов и статей
     article = get_article(db, article_id=article_id)
-    author = get_author(db, author_id=author_id)
-    if article and author:
-        article.authors.append(author)
+    if article and get_author(db, author_id=author_id):
+        db.execute(_add_article_author_stmt(article_id, author_id))
         db.commit()
-        db.refresh(article)
     return article
 
 
 def remove_author_from_article(db: Session, article_id: int, author_id: int):
     article = get_article(db, article_id=article_id)
-    author = get_author(db, author_id=author_id)
-    if article and author and author in article.authors:
-        article.authors.remove(author)
+    if article:
+        db.execute(_remove_article_author_stmt(article_id, author_id))
         db.commit()
-        db.refresh(article)
     return article
 
 
+def _article_authors_stmt(article_id: int):
+    return (
+        select(models.Author)
+        .join(models.ArticleAuthor, models.ArticleAuthor.author_id == models.Author.author_id)
+        .where(models.ArticleAuthor.article_id == article_id)
+        .order_by(models.ArticleAuthor.position)
+    )
+
+
+def get_article_authors(db: Session, article_id: int):
+    return db.execute(_article_authors_stmt(article_id)).scalars().all()
+
+
+def _articles_by_author_stmt(author_id: int, limit: int, cursor: Optional[str]):
+    # Идет по индексу ix_article_author_author_id_article_id
+    stmt = (
+        select(models.Article)
+        .options(_article_summary_options())
+        .join(models.ArticleAuthor, models.ArticleAuthor.article_id == models.Article.article_id)
+        .where(models.ArticleAuthor.author_id == author_id)
+    )
+    if cursor:
+        last_id, = _decode_cursor(cursor)
+        stmt = stmt.where(models.ArticleAuthor.article_id > last_id)
+    return stmt.order_by(models.ArticleAuthor.article_id).limit(limit + 1)
+
+
+def _articles_by_author_result(articles: list, limit: int):
+    if len(articles) > limit:
+        return articles[:limit], _encode_cursor(articles[limit - 1].article_id)
+    return articles, None
+
+
+def get_articles_by_author(db: Session, author_id: int, limit: int = 100, cursor: Optional[str] = None):
+    # Статьи автора без текста, keyset по article_id
+    articles = db.execute(_articles_by_author_stmt(author_id, limit, cursor)).scalars().all()
+    return _articles_by_author_result(articles, limit)
+
+
 # ========== Favorites CRUD ==========
 def create_favorites(db: Session, user_id: int):
     db_favorites = models.Favorites(user_id=user_id)
@@ -201,23 +600,49 @@ def get_favorites(db: Session, user_id: int):
 
 
 def add_article_to_favorites(db: Session, user_id: int, article_id: int):
-    favorites = get_favorites(db, user_id=user_id)
-    article = get_article(db, article_id=article_id)
-    if favorites and article:
-        favorites.articles.append(article)
-        db.commit()
-        db.refresh(favorites)
-    return favorites
+    add_articles_to_favorites(db, user_id=user_id, article_ids=[article_id])
+    return get_favorites(db, user_id=user_id)
 
 
 def remove_article_from_favorites(db: Session, user_id: int, article_id: int):
-    favorites = get_favorites(db, user_id=user_id)
-    article = get_article(db, article_id=article_id)
-    if favorites and article and article in favorites.articles:
-        favorites.articles.remove(article)
-        db.commit()
-        db.refresh(favorites)
-    return favorites
+    remove_articles_from_favorites(db, user_id=user_id, article_ids=[article_id])
+    return get_favorites(db, user_id=user_id)
+
+
+def _add_favorites_stmt(user_id: int, article_ids: List[int]):
+    return insert(models.FavoritesArticles).from_select(
+        ['favorites_id', 'article_id', 'added_at'],
+        select(models.Favorites.favorites_id, models.Article.article_id, func.now())
+        .where(models.Favorites.user_id == user_id, models.Article.article_id.in_(article_ids))
+    ).on_conflict_do_nothing(
+        index_elements=[models.FavoritesArticles.favorites_id, models.FavoritesArticles.article_id]
+    )
+
+
+def _remove_favorites_stmt(user_id: int, article_ids: List[int]):
+    favorites_id = select(models.Favorites.favorites_id).where(models.Favorites.user_id == user_id).scalar_subquery()
+    return delete(models.FavoritesArticles).where(
+        models.FavoritesArticles.favorites_id == favorites_id,
+        models.FavoritesArticles.article_id.in_(article_ids)
+    )
+
+
+def add_articles_to_favorites(db: Session, user_id: int, article_ids: List[int]) -> int:
+    # Один INSERT ... SELECT без загрузки коллекции избранного;
+    # несуществующие статьи и уже добавленные связи пропускаются
+    if not article_ids:
+        return 0
+    added = db.execute(_add_favorites_stmt(user_id, article_ids)).rowcount
+    db.commit()
+    return added
+
+
+def remove_articles_from_favorites(db: Session, user_id: int, article_ids: List[int]) -> int:
+    if not article_ids:
+        return 0
+    removed = db.execute(_remove_favorites_stmt(user_id, article_ids)).rowcount
+    db.commit()
+    return removed
 
 
 def get_user_favorites(db: Session, user_id: int):
@@ -225,6 +650,39 @@ def get_user_favorites(db: Session, user_id: int):
     return favorites.articles if favorites else []
 
 
+def _user_favorites_page_stmt(user_id: int, limit: int, cursor: Optional[str]):
+    stmt = (
+        select(models.Article, models.FavoritesArticles.added_at)
+        .options(_article_summary_options())
+        .join(models.FavoritesArticles, models.FavoritesArticles.article_id == models.Article.article_id)
+        .join(models.Favorites, models.Favorites.favorites_id == models.FavoritesArticles.favorites_id)
+        .where(models.Favorites.user_id == user_id)
+    )
+    if cursor:
+        last_added_at, last_id = _decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(models.FavoritesArticles.added_at, models.FavoritesArticles.article_id)
+            < tuple_(datetime.fromisoformat(last_added_at), last_id)
+        )
+    return stmt.order_by(
+        models.FavoritesArticles.added_at.desc(), models.FavoritesArticles.article_id.desc()
+    ).limit(limit + 1)
+
+
+def _user_favorites_page_result(rows: list, limit: int):
+    articles = [article for article, _ in rows[:limit]]
+    if len(rows) > limit:
+        last_article, last_added_at = rows[limit - 1]
+        return articles, _encode_cursor(last_added_at.isoformat(), last_article.article_id)
+    return articles, None
+
+
+def get_user_favorites_page(db: Session, user_id: int, limit: int = 50, cursor: Optional[str] = None):
+    # Избранное от новых к старым, без текста статей, keyset по (added_at, article_id)
+    rows = db.execute(_user_favorites_page_stmt(user_id, limit, cursor)).all()
+    return _user_favorites_page_result(rows, limit)
+
+
 # ========== ArticleVector CRUD ==========
 def create_article_vector(db: Session, article_id: int, vector_data: bytes):
     db_vector = models.ArticleVector(
@@ -237,8 +695,47 @@ def create_article_vector(db: Session, article_id: int, vector_data: bytes):
     return db_vector
 
 
+def _articles_without_vectors_stmt(after_id: int, limit: int, max_chars: int):
+    # Текст обрезается на стороне БД: модель все равно не видит больше нескольких сотен токенов
+    return (
+        select(models.Article.article_id, models.Article.title,
+               func.left(models.ArticleContent.content, max_chars).label('content'))
+        .outerjoin(models.ArticleContent, models.ArticleContent.article_id == models.Article.article_id)
+        .outerjoin(models.ArticleVector, models.ArticleVector.article_id == models.Article.article_id)
+        .where(models.ArticleVector.vector_id.is_(None), models.Article.article_id > after_id)
+        .order_by(models.Article.article_id)
+        .limit(limit)
+    )
+
+
+def get_articles_without_vectors(db: Session, after_id: int = 0, limit: int = 256, max_chars: int = 5000):
+    return db.execute(_articles_without_vectors_stmt(after_id, limit, max_chars)).all()
+
+
+def _article_vectors_upsert_stmt(vectors: List[dict], overwrite: bool):
+    stmt = insert(models.ArticleVector).values(vectors)
+    if overwrite:
+        return stmt.on_conflict_do_update(
+            index_elements=[models.ArticleVector.article_id],
+            set_={'vector_data': stmt.excluded.vector_data}
+        )
+    return stmt.on_conflict_do_nothing(index_elements=[models.ArticleVector.article_id])
+
+
+def bulk_upsert_article_vectors(db: Session, vectors: List[dict], overwrite: bool = False) -> int:
+    # Один многострочный INSERT на батч, коммит делает вызывающий код
+    if not vectors:
+        return 0
+    if overwrite:
+        entity_cache.invalidate('vector', *(vector['article_id'] for vector in vectors))
+    return db.execute(_article_vectors_upsert_stmt(vectors, overwrite)).rowcount
+
+
 def get_article_vector(db: Session, article_id: int):
-    return db.query(models.ArticleVector).filter(models.ArticleVector.article_id == article_id).first()
+    return entity_cache.get_or_load(
+        db, 'vector', article_id,
+        lambda: db.query(models.ArticleVector).filter(models.ArticleVector.article_id == article_id).first()
+    )
 
 
 def update_article_vector(db: Session, article_id: int, vector_data: bytes):
@@ -246,6 +743,7 @@ def update_article_vector(db: Session, article_id: int, vector_data: bytes):
     if db_vector:
         db_vector.vector_data = vector_data
         db.commit()
+        entity_cache.invalidate('vector', article_id)
         db.refresh(db_vector)
     return db_vector
 
@@ -255,4 +753,148 @@ def delete_article_vector(db: Session, article_id: int):
     if db_vector:
         db.delete(db_vector)
         db.commit()
-    return db_vector
\ No newline at end of file
+        entity_cache.invalidate('vector', article_id)
+    return db_vector
+
+
+def _similar_articles_stmt(query_vector, k: int, exclude_article_id: Optional[int] = None):
+    distance = models.ArticleVector.vector_data.cosine_distance(query_vector)
+    stmt = (
+        select(models.Article.article_id, models.Article.title, models.Article.authors,
+               (1 - distance).label('similarity'))
+        .join(models.ArticleVector, models.ArticleVector.article_id == models.Article.article_id)
+    )
+    if exclude_article_id is not None:
+        stmt = stmt.where(models.Article.article_id != exclude_article_id)
+    return stmt.order_by(distance).limit(k)
+
+
+def find_similar_articles(db: Session, article_id: Optional[int] = None,
+                          query_vector: Optional[List[float]] = None, k: int = 10):
+    # Поиск k ближайших статей по косинусному расстоянию, выполняется по HNSW/IVFFlat индексу
+    if query_vector is None:
+        if article_id is None:
+            raise ValueError("Нужно передать article_id или query_vector")
+        db_vector = get_article_vector(db, article_id=article_id)
+        if db_vector is None or db_vector.vector_data is None:
+            return []
+        query_vector = db_vector.vector_data
+    return db.execute(_similar_articles_stmt(query_vector, k, article_id)).all()
+
+
+# ========== ArticleChunkVector (векторы фрагментов статей) ==========
+CHUNK_INSERT_BATCH = 1000
+
+
+def _articles_without_chunks_stmt(after_id: int, limit: int, max_chars: int):
+    return (
+        select(models.Article.article_id, func.left(models.ArticleContent.content, max_chars).label('content'))
+        .join(models.ArticleContent, models.ArticleContent.article_id == models.Article.article_id)
+        .where(
+            models.Article.article_id > after_id,
+            models.ArticleContent.content.isnot(None),
+            ~exists().where(models.ArticleChunkVector.article_id == models.Article.article_id)
+        )
+        .order_by(models.Article.article_id)
+        .limit(limit)
+    )
+
+
+def get_articles_without_chunks(db: Session, after_id: int = 0, limit: int = 64, max_chars: int = 200000):
+    return db.execute(_articles_without_chunks_stmt(after_id, limit, max_chars)).all()
+
+
+def replace_article_chunk_vectors(db: Session, article_ids: List[int], chunks: List[dict]) -> int:
+    # Старые фрагменты статей удаляются в той же транзакции, коммит делает вызывающий код
+    if article_ids:
+        db.execute(delete(models.ArticleChunkVector).where(models.ArticleChunkVector.article_id.in_(article_ids)))
+    for start in range(0, len(chunks), CHUNK_INSERT_BATCH):
+        db.execute(insert(models.ArticleChunkVector).values(chunks[start:start + CHUNK_INSERT_BATCH]))
+    return len(chunks)
+
+
+def _article_chunks_search_stmt(query_vector, k: int, pooling: str, candidates: int):
+    if pooling not in ('max', 'mean'):
+        raise ValueError("pooling должен быть 'max' или 'mean'")
+
+    # Ближайшие фрагменты по HNSW-индексу, затем свертка до статей
+    distance = models.ArticleChunkVector.vector_data.cosine_distance(query_vector)
+    nearest = (
+        select(models.ArticleChunkVector.article_id, models.ArticleChunkVector.start_char,
+               models.ArticleChunkVector.end_char, (1 - distance).label('similarity'))
+        .order_by(distance)
+        .limit(candidates)
+        .subquery()
+    )
+    score = (func.max if pooling == 'max' else func.avg)(nearest.c.similarity).label('score')
+    best_first = nearest.c.similarity.desc()
+    hits = (
+        select(
+            nearest.c.article_id,
+            score,
+            func.count().label('matched_chunks'),
+            array_agg(aggregate_order_by(nearest.c.start_char, best_first))[1].label('start_char'),
+            array_agg(aggregate_order_by(nearest.c.end_char, best_first))[1].label('end_char'),
+        )
+        .group_by(nearest.c.article_id)
+        .order_by(score.desc())
+        .limit(k)
+        .subquery()
+    )
+    # Лучший фрагмент статьи возвращается как найденный абзац
+    passage = func.substr(models.ArticleContent.content, hits.c.start_char + 1, hits.c.end_char - hits.c.start_char)
+    return (
+        select(models.Article.article_id, models.Article.title, models.Article.authors,
+               hits.c.score, hits.c.matched_chunks, passage.label('passage'))
+        .join(hits, hits.c.article_id == models.Article.article_id)
+        .join(models.ArticleContent, models.ArticleContent.article_id == models.Article.article_id)
+        .order_by(hits.c.score.desc(), models.Article.article_id)
+    )
+
+
+def _ef_search_stmt(candidates: int):
+    # HNSW по умолчанию возвращает не больше hnsw.ef_search (40) ближайших соседей
+    return select(func.set_config('hnsw.ef_search', str(max(candidates, 40)), True))
+
+
+def search_article_chunks(db: Session, query_vector: List[float], k: int = 10, pooling: str = 'max',
+                          candidates: int = 100):
+    """
+    Поиск статей по ближайшим фрагментам текста.
+
+    Берутся candidates ближайших к запросу фрагментов, их сходство
+    сворачивается до статей максимумом (pooling='max') или средним
+    по найденным фрагментам статьи (pooling='mean').
+
+    Returns:
+        Строки (article_id, title, authors, score, matched_chunks, passage),
+        где passage - самый близкий к запросу фрагмент статьи
+    """
+    stmt = _article_chunks_search_stmt(query_vector, k, pooling, candidates)
+    db.execute(_ef_search_stmt(candidates))
+    return db.execute(stmt).all()
+
+
+# ========== IngestedFile (манифест загрузки PDF) ==========
+def get_ingest_manifest(db: Session) -> Dict[str, models.IngestedFile]:
+    return {entry.file_path: entry for entry in db.query(models.IngestedFile).all()}
+
+
+def upsert_ingested_files(db: Session, entries: List[dict]):
+    # Коммит делает вызывающий код вместе с батчем статей
+    if not entries:
+        return
+    stmt = insert(models.IngestedFile).values(entries)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.IngestedFile.file_path],
+        set_={
+            'file_size': stmt.excluded.file_size,
+            'file_mtime_ns': stmt.excluded.file_mtime_ns,
+            'content_hash': stmt.excluded.content_hash,
+            'status': stmt.excluded.status,
+            'article_id': stmt.excluded.article_id,
+            'ingested_at': stmt.excluded.ingested_at,
+        }
+    )
+    db.execute(stmt)
+
@@ -0,0 +1,255 @@
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("database.queries")
+
+# Одинаковый запрос, выполненный в одной сессии столько раз и больше, считается N+1
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+DEFAULT_SLOW_MS = 200.0
+
+_CRUD_MODULES = ("database.crud", "database.async_crud")
+_SKIP_PREFIXES = ("sqlalchemy", "database.instrumentation", "contextlib", "greenlet")
+_SESSION_KEY = "instrumentation_session"
+_STARTED_KEY = "instrumentation_started"
+
+
+def _caller_info():
+    """
+    Ищет по стеку внешнюю функцию crud и место вызова вне библиотек.
+
+    Для вложенных вызовов crud (add_article_to_favorites -> get_favorites)
+    запрос приписывается внешней функции, т.е. точке входа из кода приложения.
+    """
+    crud_function = None
+    call_site = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module in _CRUD_MODULES:
+            crud_function = f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+            call_site = None
+        elif call_site is None and not module.startswith(_SKIP_PREFIXES):
+            call_site = f"{os.path.relpath(frame.f_code.co_filename)}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return crud_function or "<вне crud>", call_site or "<неизвестно>"
+
+
+class QueryRecorder:
+    """
+    Собирает статистику SQL-запросов через события движка и сессии.
+
+    На каждый запрос сохраняются время, число строк, функция crud и место вызова.
+    Запросы группируются по сессиям, чтобы находить повторяющиеся
+    одинаковые запросы (N+1, обычно ленивые загрузки связей в цикле).
+    Счетчики сессии живут, пока жив объект сессии: после этого от них
+    остаются только запросы, превысившие порог, сгруппированные по тексту,
+    так что память не растет с числом обслуженных сессий.
+    """
+
+    def __init__(self, n_plus_one_threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD,
+                 slow_ms: float = DEFAULT_SLOW_MS, log_statements: bool = False, keep_records: int = 10000):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.slow_ms = slow_ms
+        self.log_statements = log_statements
+        self.keep_records = keep_records
+        self.records: List[dict] = []
+        self._lock = threading.Lock()
+        self._session_ids = itertools.count(1)
+        self._per_function = defaultdict(lambda: {'statements': 0, 'rows': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        self._per_session: Dict[int, Counter] = defaultdict(Counter)
+        self._session_sites: Dict[tuple, str] = {}
+        # Номера завершившихся сессий; weakref.finalize может сработать внутри
+        # любого кода (сборка мусора), поэтому разбор идет позже под блокировкой
+        self._finished = deque()
+        self._sessions_finished = 0
+        self._flagged: Dict[str, dict] = {}
+        self._engine = None
+
+    # ----- подписка на события -----
+    def attach(self, engine) -> None:
+        # Для AsyncEngine события вешаются на его синхронный движок
+        engine = getattr(engine, "sync_engine", engine)
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine.pool, "checkin", self._on_checkin)
+        event.listen(Session, "after_begin", self._after_begin)
+
+    def detach(self) -> None:
+        if self._engine is None:
+            return
+        event.remove(self._engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(self._engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(self._engine.pool, "checkin", self._on_checkin)
+        event.remove(Session, "after_begin", self._after_begin)
+        self._engine = None
+
+    def _after_begin(self, session, transaction, connection):
+        # Соединение помечается номером сессии до возврата в пул
+        if _SESSION_KEY not in session.info:
+            session.info[_SESSION_KEY] = next(self._session_ids)
+            weakref.finalize(session, self._finished.append, session.info[_SESSION_KEY])
+        connection.info[_SESSION_KEY] = session.info[_SESSION_KEY]
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        connection_record.info.pop(_SESSION_KEY, None)
+        # Отметки времени запросов, завершившихся ошибкой
+        connection_record.info.pop(_STARTED_KEY, None)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info[_STARTED_KEY].pop()) * 1000
+        crud_function, call_site = _caller_info()
+        session_id = conn.info.get(_SESSION_KEY)
+        rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+        record = {
+            'statement': statement,
+            'duration_ms': round(elapsed_ms, 3),
+            'rows': rows,
+            'crud_function': crud_function,
+            'call_site': call_site,
+            'session_id': session_id,
+            'executemany': executemany,
+        }
+
+        with self._lock:
+            self._collect_finished()
+            if len(self.records) < self.keep_records:
+                self.records.append(record)
+            stats = self._per_function[crud_function]
+            stats['statements'] += 1
+            stats['rows'] += rows or 0
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            if session_id is not None:
+                self._per_session[session_id][statement] += 1
+                self._session_sites.setdefault((session_id, statement), f"{crud_function} @ {call_site}")
+
+        if self.log_statements:
+            logger.info(json.dumps(record, ensure_ascii=False, default=str))
+        if elapsed_ms >= self.slow_ms:
+            logger.warning("Медленный запрос %.1f мс в %s (%s)", elapsed_ms, crud_function, call_site)
+
+    def _collect_finished(self) -> None:
+        # Вызывается под self._lock: переносит N+1 завершившихся сессий в сводку
+        while self._finished:
+            session_id = self._finished.popleft()
+            statements = self._per_session.pop(session_id, None)
+            if statements is None:  # сессия без запросов или до reset()
+                continue
+            for statement, count in statements.items():
+                site = self._session_sites.pop((session_id, statement))
+                if count >= self.n_plus_one_threshold:
+                    self._flag(statement, count, site)
+            self._sessions_finished += 1
+
+    def _flag(self, statement: str, count: int, site: str, flagged: Optional[Dict[str, dict]] = None) -> None:
+        flagged = self._flagged if flagged is None else flagged
+        entry = flagged.get(statement)
+        if entry is None:
+            flagged[statement] = {'sessions': 1, 'max_count': count, 'first_seen_in': site, 'statement': statement}
+        else:
+            entry['sessions'] += 1
+            entry['max_count'] = max(entry['max_count'], count)
+
+    # ----- отчет -----
+    def n_plus_one(self) -> List[dict]:
+        """Повторяющиеся запросы: по завершившимся сессиям и по еще открытым"""
+        with self._lock:
+            self._collect_finished()
+            flagged = {statement: dict(entry) for statement, entry in self._flagged.items()}
+            for session_id, statements in self._per_session.items():
+                for statement, count in statements.items():
+                    if count >= self.n_plus_one_threshold:
+                        self._flag(statement, count, self._session_sites[(session_id, statement)], flagged)
+        return sorted(flagged.values(), key=lambda entry: -entry['max_count'])
+
+    def report(self, top: int = 20) -> dict:
+        with self._lock:
+            per_function = {
+                name: {
+                    'statements': stats['statements'],
+                    'rows': stats['rows'],
+                    'total_ms': round(stats['total_ms'], 3),
+                    'avg_ms': round(stats['total_ms'] / stats['statements'], 3),
+                    'max_ms': round(stats['max_ms'], 3),
+                }
+                for name, stats in sorted(self._per_function.items(), key=lambda item: -item[1]['total_ms'])
+            }
+            slowest = sorted(self.records, key=lambda record: -record['duration_ms'])[:top]
+            self._collect_finished()
+            sessions = self._sessions_finished + len(self._per_session)
+        return {
+            'statements': sum(stats['statements'] for stats in per_function.values()),
+            'sessions': sessions,
+            'per_function': per_function,
+            'slowest': slowest,
+            'n_plus_one': self.n_plus_one(),
+        }
+
+    def write_report(self, path: str, top: int = 20) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(top), f, ensure_ascii=False, indent=2, default=str)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.records.clear()
+            self._per_function.clear()
+            self._per_session.clear()
+            self._session_sites.clear()
+            self._finished.clear()
+            self._sessions_finished = 0
+            self._flagged.clear()
+
+
+_recorder: Optional[QueryRecorder] = None
+
+
+def enable(engine=None, **settings) -> QueryRecorder:
+    """Включает сбор статистики запросов для движка (по умолчанию движок из database.config)"""
+    global _recorder
+    disable()
+    if engine is None:
+        from database.config import get_engine
+
+        engine = get_engine()
+    _recorder = QueryRecorder(**settings)
+    _recorder.attach(engine)
+    return _recorder
+
+
+def disable() -> None:
+    global _recorder
+    if _recorder is not None:
+        _recorder.detach()
+        _recorder = None
+
+
+def get_recorder() -> Optional[QueryRecorder]:
+    return _recorder
+
+
+@contextmanager
+def instrumented(engine=None, report_path: Optional[str] = None, **settings):
+    """Собирает статистику запросов внутри блока и при необходимости пишет JSON-отчет"""
+    recorder = enable(engine, **settings)
+    try:
+        yield recorder
+    finally:
+        disable()
+        if report_path:
+            recorder.write_report(report_path)
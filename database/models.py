@@ -1,8 +1,18 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Float
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, JSON, Float, Index, UniqueConstraint
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from pgvector.sqlalchemy import Vector
+
+# Размерность эмбеддингов bert-base-multilingual (ML-Models/bird.py)
+VECTOR_DIM = 768
+
+# Конфигурация полнотекстового поиска и ограничение на длину индексируемого текста
+# (tsvector не может быть больше 1 МБ)
+SEARCH_CONFIG = 'russian'
+SEARCH_CONTENT_CHARS = 300000
 
 Base = declarative_base()
 
@@ -43,15 +53,70 @@ class Article(Base):
     __tablename__ = 'article'
 
     article_id = Column(Integer, primary_key=True)
-    title = Column(String(255), nullable=False)
+    title = Column(String(255), nullable=False, index=True)  # дедупликация загрузки по заголовку
     authors = Column(Text)
-    content = Column(Text)
     article_url = Column(String(512))
+    content_hash = Column(String(64), unique=True, index=True)  # sha256 исходного PDF
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Текст статьи лежит в article_content и загружается только при обращении
+    body = relationship("ArticleContent", back_populates="article", uselist=False,
+                        cascade="all, delete-orphan", passive_deletes=True)
+    content = association_proxy("body", "content", creator=lambda content: ArticleContent(content=content))
+
     in_favorites = relationship("Favorites", secondary="favorites_articles", back_populates="articles")
     vector = relationship("ArticleVector", back_populates="article", uselist=False)
+    # Нормализованные авторы; authors остается строкой для показа в том виде, как в PDF
+    linked_authors = relationship("Author", secondary="article_author", back_populates="articles",
+                                  order_by="ArticleAuthor.position", passive_deletes=True)
+
+    __table_args__ = (
+        Index('ix_article_created_at_article_id', 'created_at', 'article_id'),
+    )
+
+
+class Author(Base):
+    __tablename__ = 'author'
+
+    author_id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    # Инициалы и фамилия в нижнем регистре, см. database.authors.normalize_author_name
+    normalized_name = Column(String(255), unique=True, nullable=False)
+    bio = Column(Text)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    articles = relationship("Article", secondary="article_author", back_populates="linked_authors",
+                            passive_deletes=True)
+
+
+class ArticleAuthor(Base):
+    __tablename__ = 'article_author'
+
+    article_id = Column(Integer, ForeignKey('article.article_id', ondelete='CASCADE'), primary_key=True)
+    author_id = Column(Integer, ForeignKey('author.author_id', ondelete='CASCADE'), primary_key=True)
+    position = Column(Integer, nullable=False, default=0)  # Порядок автора в статье
+
+    __table_args__ = (
+        # Статьи автора по индексу, без LIKE по строке authors
+        Index('ix_article_author_author_id_article_id', 'author_id', 'article_id'),
+    )
+
+
+class ArticleContent(Base):
+    __tablename__ = 'article_content'
+
+    article_id = Column(Integer, ForeignKey('article.article_id', ondelete='CASCADE'), primary_key=True)
+    content = Column(Text)  # Сжимается на уровне столбца (lz4 на PostgreSQL 14+)
+    # Заголовок (вес A) и начало текста (вес B); поддерживается триггерами,
+    # нужна только для поиска в SQL, поэтому не загружается вместе с текстом
+    search_vector = deferred(Column(TSVECTOR))
+
+    article = relationship("Article", back_populates="body")
+
+    __table_args__ = (
+        Index('ix_article_content_search_vector', 'search_vector', postgresql_using='gin'),
+    )
 
 
 class FavoritesArticles(Base):
@@ -61,12 +126,63 @@ class FavoritesArticles(Base):
     article_id = Column(Integer, ForeignKey('article.article_id'), primary_key=True)
     added_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
+    __table_args__ = (
+        Index('ix_favorites_articles_favorites_id_added_at', 'favorites_id', 'added_at', 'article_id'),
+    )
+
 
 class ArticleVector(Base):
     __tablename__ = 'article_vector'
 
     vector_id = Column(Integer, primary_key=True)
     article_id = Column(Integer, ForeignKey('article.article_id'), unique=True)
-    vector_data = Column(ARRAY(Float))  # Для pgvector
-
-    article = relationship("Article", back_populates="vector")
\ No newline at end of file
+    vector_data = Column(Vector(VECTOR_DIM))
+
+    article = relationship("Article", back_populates="vector")
+
+    __table_args__ = (
+        Index(
+            'ix_article_vector_vector_data',
+            'vector_data',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'vector_data': 'vector_cosine_ops'},
+        ),
+    )
+
+
+class ArticleChunkVector(Base):
+    __tablename__ = 'article_chunk_vector'
+
+    chunk_vector_id = Column(Integer, primary_key=True)
+    article_id = Column(Integer, ForeignKey('article.article_id', ondelete='CASCADE'), nullable=False)
+    chunk_index = Column(Integer, nullable=False)
+    # Границы фрагмента в article_content.content, в символах
+    start_char = Column(Integer, nullable=False)
+    end_char = Column(Integer, nullable=False)
+    vector_data = Column(Vector(VECTOR_DIM))
+
+    __table_args__ = (
+        UniqueConstraint('article_id', 'chunk_index', name='uq_article_chunk_vector_article_id_chunk_index'),
+        Index(
+            'ix_article_chunk_vector_vector_data',
+            'vector_data',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'vector_data': 'vector_cosine_ops'},
+        ),
+    )
+
+
+class IngestedFile(Base):
+    __tablename__ = 'ingested_file'
+
+    file_id = Column(Integer, primary_key=True)
+    file_path = Column(String(1024), unique=True, nullable=False)
+    file_size = Column(BigInteger, nullable=False)
+    file_mtime_ns = Column(BigInteger, nullable=False)
+    content_hash = Column(String(64), nullable=False, index=True)  # sha256 содержимого файла
+    status = Column(String(20), nullable=False)  # ingested / duplicate / no_title
+    # При удалении статьи запись манифеста остается, чтобы файл не загружался повторно
+    article_id = Column(Integer, ForeignKey('article.article_id', ondelete='SET NULL'), nullable=True)
+    ingested_at = Column(DateTime(timezone=True), default=datetime.utcnow)
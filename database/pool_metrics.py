@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Верхние границы корзин гистограммы ожидания соединения, мс
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Счетчики выдачи соединений из пула: число выдач, ожидания, таймауты и гистограмма задержек"""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.waiting = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.histogram: List[int] = [0] * (len(self.buckets_ms) + 1)
+
+    def start_wait(self) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def cancel_wait(self) -> None:
+        # Ошибка подключения, а не ожидание: в статистику задержек не попадает
+        with self._lock:
+            self.waiting -= 1
+
+    def finish_wait(self, elapsed: float, timed_out: bool = False) -> None:
+        elapsed_ms = elapsed * 1000
+        bucket = next((i for i, bound in enumerate(self.buckets_ms) if elapsed_ms <= bound), len(self.buckets_ms))
+        with self._lock:
+            self.waiting -= 1
+            self.total_wait += elapsed
+            self.max_wait = max(self.max_wait, elapsed)
+            self.histogram[bucket] += 1
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            labels = [f"<={bound}ms" for bound in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'waiting': self.waiting,
+                'total_wait_s': round(self.total_wait, 6),
+                'avg_wait_ms': round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+                'checkout_latency_histogram': dict(zip(labels, self.histogram)),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """
+    Замеряет время получения соединения из пула.
+
+    _do_get вызывается на каждую выдачу соединения и блокируется,
+    пока в пуле нет свободного соединения, так что его длительность
+    и есть время ожидания клиента.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        self.metrics.start_wait()
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.finish_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        except BaseException:
+            self.metrics.cancel_wait()
+            raise
+        self.metrics.finish_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() пересоздает пул: накопленные метрики переносятся в новый
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(pool) -> Dict:
+    """Текущее состояние пула и накопленные метрики ожидания"""
+    stats = {
+        'pool_size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'checked_in': pool.checkedin(),
+        'overflow': pool.overflow(),
+    }
+    metrics = getattr(pool, 'metrics', None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
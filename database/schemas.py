@@ -47,7 +47,20 @@ class Article(ArticleBase):
     article_id: int
     created_at: datetime
     updated_at: datetime
-    authors: List['Author'] = []
+    linked_authors: List['AuthorSummary'] = []
+
+    class Config:
+        orm_mode = True
+
+
+class ArticleSummary(BaseModel):
+    """Статья для списков: без текста, он запрашивается отдельно"""
+    article_id: int
+    title: str
+    authors: str | None = None
+    article_url: str | None = None
+    created_at: datetime
+    updated_at: datetime
 
     class Config:
         orm_mode = True
@@ -68,10 +81,20 @@ class AuthorUpdate(BaseModel):
     bio: Optional[str] = None
 
 
+class AuthorSummary(BaseModel):
+    """Автор в составе статьи, без списка его статей"""
+    author_id: int
+    name: str
+
+    class Config:
+        orm_mode = True
+
+
 class Author(AuthorBase):
     author_id: int
+    normalized_name: str
     created_at: datetime
-    articles: List[Article] = []
+    articles: List[ArticleSummary] = []
 
     class Config:
         orm_mode = True
@@ -0,0 +1,177 @@
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import models
+
+# Сколько строк матрицы умножается за раз: ограничивает временную память при поиске
+SEARCH_CHUNK_ROWS = 32_768
+
+
+class MmapVectorIndex:
+    """
+    Локальный индекс векторов статей в memory-mapped файлах.
+
+    Для поиска без расширения pgvector: векторы из article_vector
+    выгружаются нормированными в бинарный файл, и косинусная близость
+    сводится к скалярному произведению с запросом. Файлы открываются
+    только на чтение через mmap, поэтому несколько процессов используют
+    одну копию данных в page cache ОС.
+
+    Файлы индекса:
+        <path>.vectors - матрица count x dim (float32 или float16)
+        <path>.ids - article_id для каждой строки (int64)
+        <path>.json - метаданные: dim, dtype, count, last_vector_id
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.dim = 0
+        self.dtype = np.dtype('float32')
+        self.count = 0
+        self.last_vector_id = 0
+        self.vectors: Optional[np.ndarray] = None
+        self.ids: Optional[np.ndarray] = None
+        self.refresh()
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.path.with_suffix('.vectors')
+
+    @property
+    def _ids_path(self) -> Path:
+        return self.path.with_suffix('.ids')
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.path.with_suffix('.json')
+
+    def refresh(self) -> None:
+        """Перечитывает метаданные и переоткрывает mmap, если другой процесс дописал индекс"""
+        if not self._meta_path.exists():
+            return
+        meta = json.loads(self._meta_path.read_text())
+        if meta['count'] == self.count and self.vectors is not None:
+            return
+
+        self.dim = meta['dim']
+        self.dtype = np.dtype(meta['dtype'])
+        self.count = meta['count']
+        self.last_vector_id = meta['last_vector_id']
+        if self.count:
+            self.vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode='r', shape=(self.count, self.dim))
+            self.ids = np.memmap(self._ids_path, dtype=np.int64, mode='r', shape=(self.count,))
+        else:
+            self.vectors = np.empty((0, self.dim), dtype=self.dtype)
+            self.ids = np.empty((0,), dtype=np.int64)
+
+    def _write_meta(self) -> None:
+        # Метаданные пишутся после данных и атомарно: читатели видят только дописанные строки
+        tmp_path = self._meta_path.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps({
+            'dim': self.dim,
+            'dtype': self.dtype.name,
+            'count': self.count,
+            'last_vector_id': self.last_vector_id,
+        }))
+        os.replace(tmp_path, self._meta_path)
+
+    @classmethod
+    def build(cls, db: Session, path: Path, dtype: str = 'float32', batch_size: int = 10_000) -> 'MmapVectorIndex':
+        """Создает индекс заново из всей таблицы article_vector"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for suffix in ('.vectors', '.ids', '.json'):
+            path.with_suffix(suffix).unlink(missing_ok=True)
+
+        index = cls(path)
+        index.dim = models.VECTOR_DIM
+        index.dtype = np.dtype(dtype)
+        index.append_from_db(db, batch_size=batch_size)
+        return index
+
+    def append_from_db(self, db: Session, batch_size: int = 10_000) -> int:
+        """
+        Дописывает в индекс векторы, добавленные после последней выгрузки.
+
+        Новые строки определяются по vector_id, поэтому перезаписанные
+        векторы существующих статей попадут в индекс только при полной
+        пересборке через build.
+
+        Returns:
+            Количество добавленных векторов
+        """
+        query = (
+            select(models.ArticleVector.vector_id, models.ArticleVector.article_id,
+                   models.ArticleVector.vector_data)
+            .where(models.ArticleVector.vector_id > self.last_vector_id,
+                   models.ArticleVector.vector_data.isnot(None),
+                   # Вектор удаленной статьи остается с article_id = NULL
+                   models.ArticleVector.article_id.isnot(None))
+            .order_by(models.ArticleVector.vector_id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        added = 0
+        with open(self._vectors_path, 'ab') as vectors_file, open(self._ids_path, 'ab') as ids_file:
+            # Строки, дописанные прерванным запуском до _write_meta, отбрасываются,
+            # иначе файлы векторов и id разъедутся
+            vectors_file.truncate(self.count * self.dim * self.dtype.itemsize)
+            ids_file.truncate(self.count * np.dtype(np.int64).itemsize)
+            for rows in db.execute(query).partitions():
+                matrix = np.asarray([row.vector_data for row in rows], dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix /= np.where(norms == 0, 1, norms)
+
+                vectors_file.write(matrix.astype(self.dtype).tobytes())
+                ids_file.write(np.asarray([row.article_id for row in rows], dtype=np.int64).tobytes())
+                self.last_vector_id = rows[-1].vector_id
+                added += len(rows)
+
+        if added or not self._meta_path.exists():
+            self.count += added
+            self._write_meta()
+            self.vectors = None
+            self.refresh()
+        return added
+
+    def search(self, query_vector, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Возвращает k ближайших статей по косинусной близости.
+
+        Матрица перемножается с запросом блоками по SEARCH_CHUNK_ROWS строк,
+        из каждого блока берутся k лучших кандидатов через argpartition.
+
+        Returns:
+            Список (article_id, similarity) по убыванию близости
+        """
+        if not self.count or k <= 0:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        best_scores = np.empty(0, dtype=np.float32)
+        best_rows = np.empty(0, dtype=np.int64)
+        for start in range(0, self.count, SEARCH_CHUNK_ROWS):
+            block = self.vectors[start:start + SEARCH_CHUNK_ROWS]
+            # Для float16 у numpy нет BLAS, поэтому блок приводится к float32
+            if block.dtype != np.float32:
+                block = block.astype(np.float32)
+            scores = block @ query
+            if len(scores) > k:
+                top = np.argpartition(scores, -k)[-k:]
+            else:
+                top = np.arange(len(scores))
+            best_scores = np.concatenate([best_scores, scores[top]])
+            best_rows = np.concatenate([best_rows, top + start])
+
+        order = np.argsort(-best_scores)[:k]
+        return [(int(self.ids[best_rows[i]]), float(best_scores[i])) for i in order]
@@ -1,3 +1,10 @@
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import psycopg2
 from dotenv import load_dotenv
 import os
@@ -36,5 +43,85 @@ def test_db_connection():
             print("Соединение закрыто")
 
 
+def _percentile(values, percent):
+    index = max(0, min(len(values) - 1, round(len(values) * percent / 100) - 1))
+    return values[index]
+
+
+def run_pool_load_test(sessions: int, queries: int, hold: float) -> None:
+    """
+    Открывает sessions одновременных сессий через пул SQLAlchemy и в каждой
+    выполняет queries запросов SELECT 1, держа соединение еще hold секунд.
+
+    Печатает перцентили времени получения соединения и выполнения запросов,
+    а также статистику пула после теста.
+    """
+    from sqlalchemy import text
+    from database.config import SessionLocal, get_pool_settings, get_pool_stats
+
+    checkout_latencies = []
+    query_latencies = []
+    errors = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(sessions)
+
+    def worker():
+        start_barrier.wait()
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            db.connection()  # Берет соединение из пула
+            checkout = time.perf_counter() - started
+            timings = []
+            for _ in range(queries):
+                query_started = time.perf_counter()
+                db.execute(text("SELECT 1"))
+                timings.append(time.perf_counter() - query_started)
+            if hold:
+                time.sleep(hold)
+            with lock:
+                checkout_latencies.append(checkout)
+                query_latencies.extend(timings)
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+        finally:
+            db.close()
+
+    print(f"Параметры пула: {get_pool_settings()}")
+    print(f"Сессий: {sessions}, запросов в сессии: {queries}, удержание: {hold} с")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        for _ in range(sessions):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    print(f"Время теста: {elapsed:.2f} с, ошибок: {len(errors)}")
+    for name, values in (("Получение соединения", checkout_latencies), ("Запрос", query_latencies)):
+        if not values:
+            continue
+        values = sorted(values)
+        print(
+            f"{name}: p50 {statistics.median(values) * 1000:.2f} мс, "
+            f"p95 {_percentile(values, 95) * 1000:.2f} мс, "
+            f"p99 {_percentile(values, 99) * 1000:.2f} мс, "
+            f"max {values[-1] * 1000:.2f} мс"
+        )
+    for error in sorted(set(errors))[:5]:
+        print("Ошибка:", error)
+    print("Статистика пула:")
+    print(json.dumps(get_pool_stats(), ensure_ascii=False, indent=2))
+
+
 if __name__ == "__main__":
-    test_db_connection()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Проверка подключения к PostgreSQL и нагрузочный тест пула")
+    parser.add_argument("--load-test", action="store_true", help="Нагрузочный тест пула соединений")
+    parser.add_argument("--sessions", type=int, default=50, help="Количество одновременных сессий")
+    parser.add_argument("--queries", type=int, default=10, help="Запросов в каждой сессии")
+    parser.add_argument("--hold", type=float, default=0.0, help="Сколько секунд держать соединение после запросов")
+    args = parser.parse_args()
+
+    if args.load_test:
+        run_pool_load_test(args.sessions, args.queries, args.hold)
+    else:
+        test_db_connection()
\ No newline at end of file
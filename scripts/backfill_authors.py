@@ -0,0 +1,74 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Добавляем корень проекта в PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database.authors import AuthorResolver
+from database.config import SessionLocal
+from database.models import Article
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+
+def backfill_authors(db: Session, batch_size: int = 1000, replace: bool = False) -> int:
+    """
+    Заполняет таблицы author и article_author по строке Article.authors.
+
+    Статьи читаются по возрастанию article_id, каждый батч связывается
+    одним вызовом AuthorResolver.link_articles и коммитится отдельно,
+    поэтому повторный запуск безопасен: существующие связи пропускаются
+    через ON CONFLICT DO NOTHING.
+
+    Args:
+        db: Сессия SQLAlchemy
+        batch_size: Сколько статей обрабатывать за одну транзакцию
+        replace: Удалить старые связи статей и построить их заново
+
+    Returns:
+        Количество созданных связей
+    """
+    resolver = AuthorResolver(db)
+    articles = 0
+    linked = 0
+    last_id = 0
+    started = time.perf_counter()
+
+    while True:
+        rows = db.execute(
+            select(Article.article_id, Article.authors)
+            .where(Article.article_id > last_id)
+            .order_by(Article.article_id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].article_id
+        articles += len(rows)
+
+        linked += resolver.link_articles(db, rows, replace=replace)
+        db.commit()
+
+        elapsed = time.perf_counter() - started
+        print(f"Статей: {articles} (до article_id={last_id}), связей: {linked}, "
+              f"авторов: {len(resolver.index)}, {articles / elapsed:.0f} статей/с")
+
+    print(f"\nГотово: {linked} связей для {articles} статей, авторов в базе: {len(resolver.index)}")
+    return linked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Заполнение таблиц авторов по уже загруженным статьям")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Статей на одну транзакцию")
+    parser.add_argument("--replace", action="store_true", help="Пересобрать связи статей с авторами заново")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        backfill_authors(db, batch_size=args.batch_size, replace=args.replace)
+    except Exception as e:
+        print(f"Критическая ошибка: {str(e)}")
+    finally:
+        db.close()
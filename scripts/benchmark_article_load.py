@@ -0,0 +1,98 @@
+import argparse
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+# Добавляем корень проекта в PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import crud
+from database.config import SessionLocal
+from database.copy_loader import copy_articles
+from database.models import Article
+
+
+def make_articles(count: int, content_size: int) -> list:
+    """Генерирует синтетические статьи с уникальными заголовками и хешами"""
+    run_id = uuid.uuid4().hex[:8]
+    body = ("Пример текста статьи для нагрузочного теста. " * (content_size // 45 + 1))[:content_size]
+    now = datetime.now()
+    return [
+        {
+            'title': f"BENCHMARK {run_id} {i}",
+            'authors': "И.И. Иванов, П.П. Петров",
+            'content': body,
+            'article_url': f"file:///benchmark/{run_id}/{i}.pdf",
+            'content_hash': uuid.uuid4().hex + uuid.uuid4().hex,
+            'created_at': now,
+            'updated_at': now,
+        }
+        for i in range(count)
+    ]
+
+
+def load_orm(db, articles):
+    # Прежний путь обработчика через ORM; bulk_save_objects здесь не подходит,
+    # так как не сохраняет связанную строку article_content с текстом
+    db.add_all([
+        Article(
+            title=a['title'],
+            authors=a['authors'],
+            content=a['content'],
+            created_at=a['created_at'],
+            updated_at=a['updated_at']
+        )
+        for a in articles
+    ])
+    db.flush()
+
+
+def load_upsert(db, articles):
+    crud.bulk_upsert_articles(db, articles)
+
+
+def load_copy(db, articles):
+    copy_articles(db, iter(articles))
+
+
+METHODS = {
+    'orm': load_orm,
+    'upsert': load_upsert,
+    'copy': load_copy,
+}
+
+
+def run_benchmark(rows: int, content_size: int, batch_size: int, methods: list) -> None:
+    """
+    Сравнивает скорость загрузки статей разными способами.
+
+    Каждый способ работает в своей транзакции, которая в конце откатывается,
+    так что база не засоряется тестовыми строками.
+    """
+    print(f"Строк: {rows}, размер текста: {content_size} символов, батч: {batch_size}")
+    for name in methods:
+        articles = make_articles(rows, content_size)
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            for start in range(0, rows, batch_size):
+                METHODS[name](db, articles[start:start + batch_size])
+            elapsed = time.perf_counter() - started
+            print(f"{name:>7}: {elapsed:8.2f} с, {rows / elapsed:10.1f} строк/с")
+        finally:
+            db.rollback()
+            db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сравнение способов загрузки статей в базу")
+    parser.add_argument("--rows", type=int, default=2000, help="Количество статей")
+    parser.add_argument("--content-size", type=int, default=50_000, help="Размер текста статьи в символах")
+    parser.add_argument("--batch-size", type=int, default=500, help="Размер батча")
+    parser.add_argument("--methods", nargs="+", choices=list(METHODS), default=list(METHODS),
+                        help="Какие способы сравнивать")
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.content_size, args.batch_size, args.methods)
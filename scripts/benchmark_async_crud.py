@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Добавляем корень проекта в PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+
+from database import async_crud, crud
+from database.cache import configure_cache
+from database.config import SessionLocal, get_async_engine, get_async_sessionmaker
+from database.models import Article, User
+
+
+def load_ids(limit: int):
+    db = SessionLocal()
+    try:
+        user_ids = db.execute(select(User.user_id).limit(limit)).scalars().all()
+        article_ids = db.execute(select(Article.article_id).limit(limit)).scalars().all()
+    finally:
+        db.close()
+    if not user_ids or not article_ids:
+        raise SystemExit("Для бенчмарка нужны пользователи и статьи в базе")
+    return user_ids, article_ids
+
+
+def sync_request(user_id: int, article_id: int) -> float:
+    # Типичный запрос API: пользователь, карточка статьи и первая страница избранного
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        crud.get_user(db, user_id)
+        crud.get_article_summaries_page(db, limit=1, cursor=None)
+        crud.get_article_content(db, article_id)
+        crud.get_user_favorites_page(db, user_id, limit=20)
+    finally:
+        db.close()
+    return time.perf_counter() - started
+
+
+async def async_request(user_id: int, article_id: int) -> float:
+    started = time.perf_counter()
+    async with get_async_sessionmaker()() as db:
+        await async_crud.get_user(db, user_id)
+        await async_crud.get_article_summaries_page(db, limit=1, cursor=None)
+        await async_crud.get_article_content(db, article_id)
+        await async_crud.get_user_favorites_page(db, user_id, limit=20)
+    return time.perf_counter() - started
+
+
+def run_sync(requests: list, concurrency: int):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda args: sync_request(*args), requests))
+    return time.perf_counter() - started, latencies
+
+
+async def run_async(requests: list, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(user_id, article_id):
+        async with semaphore:
+            return await async_request(user_id, article_id)
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(limited(*args) for args in requests))
+    elapsed = time.perf_counter() - started
+    await get_async_engine().dispose()
+    return elapsed, latencies
+
+
+def report(name: str, elapsed: float, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    print(f"{name:>6}: {len(latencies) / elapsed:8.1f} запр/с, p50 {p50:7.2f} мс, p95 {p95:7.2f} мс")
+
+
+def run_benchmark(total: int, concurrency: int) -> None:
+    """
+    Сравнивает пропускную способность синхронного crud (пул потоков)
+    и async_crud (asyncio.gather) на одинаковом наборе запросов.
+
+    Кеш сущностей отключается, чтобы обе версии ходили в базу.
+    """
+    configure_cache(None)
+    user_ids, article_ids = load_ids(1000)
+    requests = [
+        (user_ids[i % len(user_ids)], article_ids[i % len(article_ids)])
+        for i in range(total)
+    ]
+    print(f"Запросов: {total}, параллельно: {concurrency}")
+    report("sync", *run_sync(requests, concurrency))
+    report("async", *asyncio.run(run_async(requests, concurrency)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сравнение синхронного и асинхронного слоя работы с БД")
+    parser.add_argument("--requests", type=int, default=2000, help="Общее количество запросов")
+    parser.add_argument("--concurrency", type=int, default=15,
+                        help="Количество одновременных запросов (по умолчанию равно размеру пула)")
+    args = parser.parse_args()
+
+    run_benchmark(args.requests, args.concurrency)
@@ -0,0 +1,75 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Замер выполняется в отдельном интерпретаторе, чтобы модули не были уже загружены
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter() - started
+result = {{'import_s': imported}}
+if {connect}:
+    from sqlalchemy import text
+    from database.config import SessionLocal
+    started = time.perf_counter()
+    db = SessionLocal()
+    db.execute(text("SELECT 1"))
+    db.close()
+    result['first_query_s'] = time.perf_counter() - started
+print(json.dumps(result))
+"""
+
+DEFAULT_MODULES = ["database.config", "database.crud", "scripts.pdf_article_processor"]
+
+
+def measure(module: str, runs: int, connect: bool) -> dict:
+    """Запускает probe runs раз и возвращает медианы замеров в миллисекундах"""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(root=str(PROJECT_ROOT), module=module, connect=connect)],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        key: round(statistics.median(sample[key] for sample in samples) * 1000, 2)
+        for key in samples[0]
+    }
+
+
+def print_import_profile(module: str, top: int) -> None:
+    # -X importtime печатает в stderr время импорта каждого модуля (в микросекундах)
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    print(f"Самые дорогие импорты {module}:")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} мс (собственное {self_us / 1000:6.1f} мс)  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Время запуска: импорт модулей и первый запрос к базе")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES, help="Какие модули импортировать")
+    parser.add_argument("--runs", type=int, default=5, help="Количество запусков на модуль")
+    parser.add_argument("--connect", action="store_true", help="Замерить также первый запрос к базе")
+    parser.add_argument("--profile", type=int, metavar="N", help="Показать N самых дорогих импортов")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        print(f"{module}: {measure(module, args.runs, args.connect)}")
+        if args.profile:
+            print_import_profile(module, args.profile)
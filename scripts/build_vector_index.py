@@ -0,0 +1,36 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Добавляем корень проекта в PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database.config import SessionLocal
+from database.vector_index import MmapVectorIndex
+
+DEFAULT_INDEX_PATH = Path(__file__).parent.parent / ".cache" / "vector_index" / "article_vectors"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Выгрузка векторов статей в локальный mmap-индекс")
+    parser.add_argument("--path", type=Path, default=DEFAULT_INDEX_PATH, help="Путь к файлам индекса (без расширения)")
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32",
+                        help="Тип хранения векторов при полной сборке")
+    parser.add_argument("--append", action="store_true", help="Дописать только новые векторы")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Строк на одну выборку из базы")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        if args.append and args.path.with_suffix('.json').exists():
+            index = MmapVectorIndex(args.path)
+            added = index.append_from_db(db, batch_size=args.batch_size)
+            print(f"Добавлено векторов: {added}, всего в индексе: {index.count}")
+        else:
+            index = MmapVectorIndex.build(db, args.path, dtype=args.dtype, batch_size=args.batch_size)
+            print(f"Индекс собран: {index.count} векторов, {index.dtype.name}")
+        print(f"Время: {time.perf_counter() - started:.1f} с")
+    finally:
+        db.close()
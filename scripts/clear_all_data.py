@@ -1,69 +1,155 @@
 # scripts/clear_all_data.py
+import argparse
 import sys
+import time
+from datetime import datetime
 from pathlib import Path
 
 # Добавляем корень проекта в PYTHONPATH
 sys.path.append(str(Path(__file__).parent.parent))
 
-from sqlalchemy import text
-from database.config import get_db
-from database.models import (
-    User, InterfaceSettings, Article,
-    ArticleVector, Favorites,
-    FavoritesArticles, Base
-)
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
 
+from database.cache import entity_cache
+from database.config import SessionLocal, get_database_url
+from database.models import Article, Base
 
-def clear_all_tables(db):
-    """Очищает все таблицы в правильном порядке с учетом зависимостей"""
-    try:
-        # Отключаем проверку внешних ключей для безопасного удаления
-        db.execute(text("SET session_replication_role = 'replica';"))
+PROJECT_ROOT = Path(__file__).parent.parent
 
-        # Удаляем данные из таблиц с учетом зависимостей
-        db.query(FavoritesArticles).delete()
-        db.query(ArticleVector).delete()
-        db.query(Favorites).delete()
-        db.query(InterfaceSettings).delete()
-        db.query(Article).delete()
-        db.query(User).delete()
 
-        # Включаем проверку внешних ключей обратно
-        db.execute(text("SET session_replication_role = 'origin';"))
+def clear_all_tables(db: Session) -> None:
+    """
+    Очищает все таблицы моделей одним TRUNCATE ... RESTART IDENTITY CASCADE.
 
+    В отличие от построчного DELETE не пишет каждую строку в WAL, сбрасывает
+    счетчики первичных ключей и не требует прав суперпользователя.
+    Таблица alembic_version не затрагивается.
+    """
+    tables = ", ".join(f'"{table.name}"' for table in reversed(Base.metadata.sorted_tables))
+    try:
+        db.execute(text(f"TRUNCATE TABLE {tables} RESTART IDENTITY CASCADE"))
         db.commit()
-        print("Все таблицы успешно очищены!")
-    except Exception as e:
+    except Exception:
         db.rollback()
-        raise e
+        raise
+    entity_cache.clear()
 
 
-def drop_and_recreate_tables(db):
-    """Полностью удаляет и создает таблицы заново (более радикальный вариант)"""
-    try:
-        Base.metadata.drop_all(bind=db.get_bind())
-        Base.metadata.create_all(bind=db.get_bind())
-        print("Таблицы успешно пересозданы!")
-    except Exception as e:
-        db.rollback()
-        raise e
+def _article_references():
+    """
+    Внешние ключи других таблиц моделей на article.article_id без ON DELETE.
+
+    Ключи с CASCADE или SET NULL база обрабатывает сама при удалении статьи.
+    """
+    article_table = Article.__table__
+    return [
+        fk.parent
+        for table in Base.metadata.sorted_tables if table is not article_table
+        for fk in table.foreign_keys if fk.column.table is article_table and fk.ondelete is None
+    ]
+
+
+def delete_articles_before(db: Session, before: datetime, chunk_size: int = 1000,
+                           max_chunks: int = None) -> int:
+    """
+    Удаляет статьи, созданные раньше before, вместе с зависимыми строками.
+
+    Удаление идет порциями по chunk_size статей, каждая порция в своей
+    транзакции, поэтому прерванный запуск можно просто повторить: он
+    продолжит с оставшихся статей. Зависимые таблицы (векторы, связи
+    с избранным и т.д.) находятся по внешним ключам моделей.
+
+    Returns:
+        Количество удаленных статей
+    """
+    references = _article_references()
+    deleted = 0
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        started = time.perf_counter()
+        ids = db.execute(
+            select(Article.article_id)
+            .where(Article.created_at < before)
+            .order_by(Article.article_id)
+            .limit(chunk_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            break
+
+        try:
+            for column in references:
+                db.execute(delete(column.table).where(column.in_(ids)))
+            db.execute(delete(Article).where(Article.article_id.in_(ids)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        entity_cache.invalidate('article', *ids)
+        entity_cache.invalidate('vector', *ids)
+
+        deleted += len(ids)
+        chunks += 1
+        print(f"  удалено {deleted} статей (порция {len(ids)} за {time.perf_counter() - started:.2f} с)")
+    return deleted
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    ini_path = PROJECT_ROOT / "alembic.ini"
+    config = Config(str(ini_path)) if ini_path.exists() else Config()
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    config.set_main_option("sqlalchemy.url", get_database_url().replace("%", "%%"))
+    return config
+
+
+def drop_and_recreate_tables() -> None:
+    """Пересоздает схему через миграции Alembic: downgrade до base и upgrade до head"""
+    from alembic import command
+
+    config = _alembic_config()
+    command.downgrade(config, "base")
+    command.upgrade(config, "head")
+    entity_cache.clear()
 
 
 if __name__ == "__main__":
-    db = next(get_db())
-    try:
-        print("Выберите действие:")
-        print("1 - Очистить данные в таблицах")
-        print("2 - Полностью пересоздать таблицы")
-        choice = input("Введите номер (1/2): ").strip()
-
-        if choice == "1":
-            clear_all_tables(db)
-        elif choice == "2":
-            drop_and_recreate_tables(db)
-        else:
-            print("Неверный выбор. Введите 1 или 2.")
-    except Exception as e:
-        print(f"Ошибка: {e}")
-    finally:
-        db.close()
\ No newline at end of file
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--yes", action="store_true", help="Не спрашивать подтверждение")
+
+    parser = argparse.ArgumentParser(description="Очистка данных в базе")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+    subparsers.add_parser("truncate", parents=[common], help="Очистить все таблицы одним TRUNCATE")
+    delete_parser = subparsers.add_parser("delete-articles", parents=[common],
+                                          help="Удалить старые статьи порциями")
+    delete_parser.add_argument("--before", required=True, type=datetime.fromisoformat,
+                               help="Удалить статьи, созданные раньше этой даты (ISO, например 2024-01-01)")
+    delete_parser.add_argument("--chunk-size", type=int, default=1000, help="Статей в одной транзакции")
+    delete_parser.add_argument("--max-chunks", type=int, help="Остановиться после стольких порций")
+    subparsers.add_parser("recreate", parents=[common], help="Пересоздать схему миграциями Alembic")
+    args = parser.parse_args()
+
+    if not args.yes:
+        answer = input(f"Режим '{args.mode}' удалит данные. Продолжить? (y/N): ").strip().lower()
+        if answer != "y":
+            print("Отменено")
+            sys.exit(1)
+
+    started = time.perf_counter()
+    if args.mode == "recreate":
+        drop_and_recreate_tables()
+        print("Схема пересоздана")
+    else:
+        db = SessionLocal()
+        try:
+            if args.mode == "truncate":
+                clear_all_tables(db)
+                print("Все таблицы очищены")
+            else:
+                count = delete_articles_before(db, args.before, args.chunk_size, args.max_chunks)
+                print(f"Удалено статей: {count}")
+        finally:
+            db.close()
+    print(f"Время: {time.perf_counter() - started:.2f} с")
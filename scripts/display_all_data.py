@@ -1,9 +1,11 @@
+import argparse
 import sys
 from pathlib import Path
 
 # Добавляем корень проекта в PYTHONPATH
 sys.path.append(str(Path(__file__).parent.parent))
 
+from database import instrumentation
 from database.config import get_db
 from database.models import (
     User, InterfaceSettings,
@@ -11,7 +13,7 @@ from database.models import (
     ArticleVector, Favorites,
     FavoritesArticles
 )
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, load_only
 
 def display_all_tables(db):
     """Отображает содержимое всех таблиц"""
@@ -26,19 +28,24 @@ def display_all_tables(db):
         print(f"ID: {setting.settings_id}, Пользователь: {setting.user.name}, Тема: {setting.theme}")
 
     print("\n=== Статьи ===")
-    articles = db.query(Article).all()  # Убрали joinedload для authors
+    # Текст статьи не выводится, поэтому и не загружается
+    articles = db.query(Article).options(load_only(Article.title, Article.authors, Article.article_url)).all()
     for article in articles:
         print(f"ID: {article.article_id}, Заголовок: {article.title}, Авторы: {article.authors}, URL: {article.article_url}")
 
     print("\n=== Векторные представления ===")
-    vectors = db.query(ArticleVector).options(joinedload(ArticleVector.article)).all()
+    vectors = db.query(ArticleVector).options(joinedload(ArticleVector.article).load_only(Article.title)).all()
     for vector in vectors:
-        print(f"ID: {vector.vector_id}, Статья: {vector.article.title}, Размер вектора: {len(vector.vector_data) if vector.vector_data else 0} байт")
+        # pgvector возвращает numpy-массив: его нельзя проверять через if
+        dimensions = len(vector.vector_data) if vector.vector_data is not None else 0
+        # У вектора удаленной статьи article_id = NULL
+        title = vector.article.title if vector.article is not None else None
+        print(f"ID: {vector.vector_id}, Статья: {title}, Размерность вектора: {dimensions}")
 
     print("\n=== Избранное ===")
     favorites = db.query(Favorites).options(
         joinedload(Favorites.user),
-        joinedload(Favorites.articles)
+        joinedload(Favorites.articles).load_only(Article.title)
     ).all()
     for fav in favorites:
         articles = ", ".join([a.title for a in fav.articles]) if fav.articles else "Нет статей"
@@ -50,8 +57,18 @@ def display_all_tables(db):
         print(f"Избранное ID: {link.favorites_id}, Статья ID: {link.article_id}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Вывод содержимого всех таблиц")
+    parser.add_argument("--query-report", help="Записать JSON-отчет о выполненных SQL-запросах в этот файл")
+    args = parser.parse_args()
+
+    if args.query_report:
+        instrumentation.enable()
     db = next(get_db())
     try:
         display_all_tables(db)
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+        recorder = instrumentation.get_recorder()
+        if recorder is not None:
+            recorder.write_report(args.query_report)
+            instrumentation.disable()
\ No newline at end of file
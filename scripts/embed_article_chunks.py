@@ -0,0 +1,134 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Добавляем корень проекта и папку с моделями в PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "ML-Models"))
+
+from database import crud
+from database.config import SessionLocal
+from sqlalchemy.orm import Session
+
+
+def embed_article_chunks(db: Session, batch_size: int = 32, encode_batch_size: int = 64,
+                         window: int = None, overlap: int = None, max_chunks: int = 200,
+                         max_chars: int = 200000, limit: int = None) -> int:
+    """
+    Режет тексты статей на перекрывающиеся окна токенов и сохраняет вектор каждого фрагмента.
+
+    Модель видит только первые max_seq_length токенов, поэтому один вектор
+    на статью описывает лишь ее начало. Фрагменты покрывают весь текст
+    (до max_chunks на статью). Статьи выбираются по возрастанию article_id
+    среди тех, у которых еще нет фрагментов; фрагменты всех статей батча
+    кодируются вместе и записываются одной транзакцией, поэтому прерванный
+    запуск продолжается с того же места.
+
+    Args:
+        db: Сессия SQLAlchemy
+        batch_size: Сколько статей обрабатывать за одну транзакцию
+        encode_batch_size: Размер батча модели (во фрагментах)
+        window: Длина фрагмента в токенах (None - максимум модели)
+        overlap: Перекрытие соседних фрагментов в токенах (None - по умолчанию)
+        max_chunks: Максимум фрагментов на статью
+        max_chars: Сколько символов текста статьи читать из базы
+        limit: Максимум статей за запуск (None - все)
+
+    Returns:
+        Количество сохраненных фрагментов
+    """
+    from bird import get_model
+    from chunking import DEFAULT_OVERLAP, split_into_chunks, window_size
+
+    model = get_model()
+    window = window or window_size(model)
+    overlap = DEFAULT_OVERLAP if overlap is None else overlap
+    articles = 0
+    saved = 0
+    last_id = 0
+    started = time.perf_counter()
+
+    while limit is None or articles < limit:
+        fetch = batch_size if limit is None else min(batch_size, limit - articles)
+        rows = crud.get_articles_without_chunks(db, after_id=last_id, limit=fetch, max_chars=max_chars)
+        if not rows:
+            break
+        last_id = rows[-1].article_id
+        articles += len(rows)
+
+        pending = [
+            (row.article_id, chunk)
+            for row in rows
+            for chunk in split_into_chunks(row.content, model.tokenizer, window, overlap, max_chunks)
+        ]
+        if not pending:
+            continue
+
+        embeddings = model.encode(
+            [chunk.text for _, chunk in pending],
+            batch_size=encode_batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+        saved += crud.replace_article_chunk_vectors(db, [row.article_id for row in rows], [
+            {
+                'article_id': article_id,
+                'chunk_index': chunk.index,
+                'start_char': chunk.start_char,
+                'end_char': chunk.end_char,
+                'vector_data': embedding.tolist(),
+            }
+            for (article_id, chunk), embedding in zip(pending, embeddings)
+        ])
+        db.commit()
+
+        elapsed = time.perf_counter() - started
+        print(f"Статей: {articles}, фрагментов: {saved} (до article_id={last_id}), "
+              f"{saved / elapsed:.1f} фрагментов/с")
+
+    elapsed = time.perf_counter() - started
+    if saved:
+        print(f"\nГотово: {saved} фрагментов из {articles} статей за {elapsed:.1f} с")
+    else:
+        print("Все статьи уже разбиты на фрагменты")
+    return saved
+
+
+def search(db: Session, query: str, k: int, pooling: str, candidates: int) -> None:
+    from bird import get_model
+
+    query_vector = get_model().encode(query, convert_to_numpy=True).tolist()
+    for row in crud.search_article_chunks(db, query_vector, k=k, pooling=pooling, candidates=candidates):
+        passage = " ".join(row.passage.split())[:300] if row.passage else ""
+        print(f"[{row.score:.3f}, фрагментов: {row.matched_chunks}] {row.article_id}: {row.title}")
+        print(f"    {passage}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Векторы фрагментов статей и поиск по ним")
+    parser.add_argument("--batch-size", type=int, default=32, help="Статей на одну транзакцию")
+    parser.add_argument("--encode-batch-size", type=int, default=64, help="Размер батча модели")
+    parser.add_argument("--window", type=int, default=None, help="Длина фрагмента в токенах")
+    parser.add_argument("--overlap", type=int, default=None, help="Перекрытие фрагментов в токенах")
+    parser.add_argument("--max-chunks", type=int, default=200, help="Максимум фрагментов на статью")
+    parser.add_argument("--limit", type=int, default=None, help="Максимум статей за запуск")
+    parser.add_argument("--search", metavar="QUERY", help="Вместо расчета векторов найти статьи по запросу")
+    parser.add_argument("--k", type=int, default=10, help="Сколько статей вернуть при поиске")
+    parser.add_argument("--pooling", choices=['max', 'mean'], default='max',
+                        help="Как сворачивать сходство фрагментов до статьи")
+    parser.add_argument("--candidates", type=int, default=100, help="Сколько ближайших фрагментов рассматривать")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.search:
+            search(db, args.search, args.k, args.pooling, args.candidates)
+        else:
+            embed_article_chunks(db, batch_size=args.batch_size, encode_batch_size=args.encode_batch_size,
+                                 window=args.window, overlap=args.overlap, max_chunks=args.max_chunks,
+                                 limit=args.limit)
+    except Exception as e:
+        print(f"Критическая ошибка: {str(e)}")
+    finally:
+        db.close()
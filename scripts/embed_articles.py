@@ -0,0 +1,91 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Добавляем корень проекта и папку с моделями в PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "ML-Models"))
+
+from database import crud
+from database.config import SessionLocal
+from sqlalchemy.orm import Session
+
+
+def article_text(title: str, content: str) -> str:
+    """Текст статьи для эмбеддинга: заголовок и начало содержимого"""
+    return f"{title}\n{content or ''}"
+
+
+def embed_articles(db: Session, batch_size: int = 256, encode_batch_size: int = 32,
+                   max_chars: int = 5000, limit: int = None) -> int:
+    """
+    Считает эмбеддинги для статей без вектора и сохраняет их батчами.
+
+    Статьи выбираются по возрастанию article_id, каждый батч кодируется
+    моделью и записывается одним INSERT ... ON CONFLICT DO NOTHING с коммитом,
+    поэтому прерванный запуск продолжается с того же места.
+
+    Args:
+        db: Сессия SQLAlchemy
+        batch_size: Сколько статей выбирать и записывать за одну транзакцию
+        encode_batch_size: Размер батча для модели
+        max_chars: Сколько символов текста статьи передавать модели
+        limit: Максимум статей за запуск (None - все)
+
+    Returns:
+        Количество сохраненных векторов
+    """
+    from bird import get_model
+
+    model = get_model()
+    saved = 0
+    last_id = 0
+    started = time.perf_counter()
+
+    while limit is None or saved < limit:
+        fetch = batch_size if limit is None else min(batch_size, limit - saved)
+        rows = crud.get_articles_without_vectors(db, after_id=last_id, limit=fetch, max_chars=max_chars)
+        if not rows:
+            break
+        last_id = rows[-1].article_id
+
+        embeddings = model.encode(
+            [article_text(row.title, row.content) for row in rows],
+            batch_size=encode_batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+        saved += crud.bulk_upsert_article_vectors(db, [
+            {'article_id': row.article_id, 'vector_data': embedding.tolist()}
+            for row, embedding in zip(rows, embeddings)
+        ])
+        db.commit()
+
+        elapsed = time.perf_counter() - started
+        print(f"Сохранено векторов: {saved} (до article_id={last_id}), {saved / elapsed:.1f} статей/с")
+
+    elapsed = time.perf_counter() - started
+    if saved:
+        print(f"\nГотово: {saved} векторов за {elapsed:.1f} с ({saved / elapsed:.1f} статей/с)")
+    else:
+        print("Все статьи уже имеют векторы")
+    return saved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Расчет эмбеддингов для статей без вектора")
+    parser.add_argument("--batch-size", type=int, default=256, help="Статей на одну транзакцию")
+    parser.add_argument("--encode-batch-size", type=int, default=32, help="Размер батча модели")
+    parser.add_argument("--max-chars", type=int, default=5000, help="Сколько символов статьи передавать модели")
+    parser.add_argument("--limit", type=int, default=None, help="Максимум статей за запуск")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        embed_articles(db, batch_size=args.batch_size, encode_batch_size=args.encode_batch_size,
+                       max_chars=args.max_chars, limit=args.limit)
+    except Exception as e:
+        print(f"Критическая ошибка: {str(e)}")
+    finally:
+        db.close()
@@ -0,0 +1,183 @@
+import argparse
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+# Добавляем корень проекта в PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from database.config import SessionLocal
+from database.models import (
+    User, InterfaceSettings,
+    Article, ArticleContent, Author, ArticleAuthor,
+    ArticleVector, ArticleChunkVector, Favorites,
+    FavoritesArticles, IngestedFile
+)
+
+# Таблицы в порядке зависимостей и столбцы, которые не выгружаются по умолчанию
+TABLES = {
+    'user': (User, ()),
+    'interface_settings': (InterfaceSettings, ()),
+    'article': (Article, ()),
+    'article_content': (ArticleContent, ('search_vector',)),
+    'author': (Author, ()),
+    'article_author': (ArticleAuthor, ()),
+    'article_vector': (ArticleVector, ()),
+    'article_chunk_vector': (ArticleChunkVector, ()),
+    'favorites': (Favorites, ()),
+    'favorites_articles': (FavoritesArticles, ()),
+    'ingested_file': (IngestedFile, ()),
+}
+
+COMPRESSORS = {
+    'none': ('', open),
+    'gzip': ('.gz', gzip.open),
+    'bz2': ('.bz2', bz2.open),
+    'xz': ('.xz', lzma.open),
+}
+
+PROGRESS_EVERY = 50_000
+
+
+def to_plain(value):
+    """Приводит значения столбцов к типам, которые понимают json и csv"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, 'tolist'):  # pgvector возвращает numpy-массивы
+        return value.tolist()
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+def parse_columns(specs: list) -> dict:
+    """Разбирает аргументы вида article=article_id,title,authors"""
+    columns = {}
+    for spec in specs or []:
+        table, _, names = spec.partition('=')
+        if table not in TABLES or not names:
+            raise ValueError(f"Некорректное описание столбцов: {spec}")
+        columns[table] = [name.strip() for name in names.split(',') if name.strip()]
+    return columns
+
+
+def table_columns(table_name: str, requested: list = None) -> list:
+    model, excluded = TABLES[table_name]
+    table = model.__table__
+    if requested:
+        unknown = [name for name in requested if name not in table.c]
+        if unknown:
+            raise ValueError(f"В таблице {table_name} нет столбцов: {', '.join(unknown)}")
+        return [table.c[name] for name in requested]
+    return [column for column in table.c if column.name not in excluded]
+
+
+def estimate_rows(db: Session, table_name: str) -> int:
+    # Оценка из статистики планировщика: count(*) на больших таблицах сам по себе долгий
+    estimate = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+        {'name': f'"{table_name}"'}
+    ).scalar()
+    return max(int(estimate or 0), 0)
+
+
+def export_table(db: Session, table_name: str, output_dir: Path, fmt: str = 'jsonl',
+                 compression: str = 'none', columns: list = None, batch_size: int = 2000) -> int:
+    """
+    Потоково выгружает таблицу в файл JSONL или CSV.
+
+    Строки читаются серверным курсором порциями по batch_size, поэтому
+    потребление памяти не зависит от размера таблицы.
+
+    Returns:
+        Количество выгруженных строк
+    """
+    model, _ = TABLES[table_name]
+    selected = table_columns(table_name, columns)
+    names = [column.name for column in selected]
+    stmt = (
+        select(*selected)
+        .order_by(*model.__table__.primary_key.columns)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+
+    suffix, opener = COMPRESSORS[compression]
+    path = output_dir / f"{table_name}.{fmt}{suffix}"
+    estimate = estimate_rows(db, table_name)
+    exported = 0
+    started = time.perf_counter()
+
+    with opener(path, 'wt', encoding='utf-8', newline='') as f:
+        writer = None
+        if fmt == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(names)
+
+        for partition in db.execute(stmt).partitions():
+            for row in partition:
+                values = [to_plain(value) for value in row]
+                if writer is not None:
+                    writer.writerow([
+                        json.dumps(value) if isinstance(value, list) else value
+                        for value in values
+                    ])
+                else:
+                    f.write(json.dumps(dict(zip(names, values)), ensure_ascii=False))
+                    f.write('\n')
+            previous = exported
+            exported += len(partition)
+            if exported // PROGRESS_EVERY != previous // PROGRESS_EVERY:
+                elapsed = time.perf_counter() - started
+                total = f"~{estimate}" if estimate else "?"
+                print(f"  {table_name}: {exported}/{total} строк, {exported / elapsed:.0f} строк/с",
+                      file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    print(f"{table_name}: {exported} строк за {elapsed:.1f} с -> {path}")
+    return exported
+
+
+def export_tables(db: Session, output_dir: Path, tables: list, fmt: str = 'jsonl', compression: str = 'none',
+                  columns: dict = None, batch_size: int = 2000) -> dict:
+    """Выгружает таблицы из одного снимка базы (REPEATABLE READ, только чтение)"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    columns = columns or {}
+    db.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+    db.execute(text("SET TRANSACTION READ ONLY"))
+    try:
+        return {
+            table_name: export_table(db, table_name, output_dir, fmt, compression,
+                                     columns.get(table_name), batch_size)
+            for table_name in tables
+        }
+    finally:
+        db.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Потоковая выгрузка таблиц в JSONL/CSV")
+    parser.add_argument("--output", default="export", help="Папка для файлов выгрузки")
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES), default=list(TABLES),
+                        help="Какие таблицы выгружать")
+    parser.add_argument("--format", choices=['jsonl', 'csv'], default='jsonl', help="Формат файлов")
+    parser.add_argument("--compression", choices=list(COMPRESSORS), default='none', help="Сжатие файлов")
+    parser.add_argument("--columns", action="append",
+                        help="Столбцы таблицы, например article_content=article_id,content (можно повторять)")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Строк за одно чтение из курсора")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        export_tables(db, Path(args.output), args.tables, args.format, args.compression,
+                      parse_columns(args.columns), args.batch_size)
+    finally:
+        db.close()
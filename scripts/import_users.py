@@ -0,0 +1,38 @@
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+# Добавляем корень проекта в PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import crud
+from database.config import SessionLocal
+from database.schemas import UserCreate
+
+
+def read_users(csv_path: Path) -> list:
+    """Читает пользователей из CSV с колонками name и email"""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return [UserCreate(name=row["name"], email=row["email"]) for row in csv.DictReader(f)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Массовый импорт пользователей из CSV (колонки name, email)")
+    parser.add_argument("csv_path", type=Path, help="Путь к CSV файлу")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Пользователей на одну транзакцию")
+    args = parser.parse_args()
+
+    users = read_users(args.csv_path)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = crud.import_users(db, users, batch_size=args.batch_size)
+        print(f"Создано пользователей: {result['created']}, пропущено (email уже есть): {result['skipped']}, "
+              f"время: {time.perf_counter() - started:.1f} с")
+    except Exception as e:
+        db.rollback()
+        print(f"Ошибка импорта: {e}")
+    finally:
+        db.close()
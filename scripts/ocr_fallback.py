@@ -0,0 +1,106 @@
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pytesseract
+from pdf2image import convert_from_path
+
+from scripts.text_cache import PageTextCache
+
+DEFAULT_DPI = 300
+DEFAULT_LANG = "rus+eng"
+# Страница с более коротким текстовым слоем считается сканом
+MIN_TEXT_CHARS = 50
+# Максимум страниц на OCR в одном документе
+MAX_OCR_PAGES = 50
+# Увеличивать при изменении растеризации или настроек распознавания
+OCR_VERSION = 1
+
+
+@dataclass
+class OcrSettings:
+    """Настройки распознавания страниц без текстового слоя"""
+    dpi: int = DEFAULT_DPI
+    lang: str = DEFAULT_LANG
+    min_chars: int = MIN_TEXT_CHARS
+    max_pages: int = MAX_OCR_PAGES
+    workers: int = 1
+    cache: Optional[PageTextCache] = None
+
+
+def needs_ocr(page_text: str, min_chars: int = MIN_TEXT_CHARS) -> bool:
+    """Проверяет, что у страницы нет текстового слоя или он слишком короткий"""
+    return len(page_text.strip()) < min_chars
+
+
+def page_hash(content_hash: str, page_number: int, settings: OcrSettings) -> str:
+    """Ключ кеша OCR для страницы: файл, номер страницы и параметры распознавания"""
+    key = f"{content_hash}:{page_number}:{settings.dpi}:{settings.lang}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def ocr_page(task: Tuple[str, int, int, str]) -> str:
+    """
+    Растеризует одну страницу PDF и распознает ее.
+
+    Args:
+        task: Кортеж (путь к PDF, номер страницы с нуля, DPI, языки tesseract)
+    """
+    file_path, page_number, dpi, lang = task
+    images = convert_from_path(file_path, dpi=dpi, first_page=page_number + 1, last_page=page_number + 1)
+    if not images:
+        return ""
+    return pytesseract.image_to_string(images[0], lang=lang)
+
+
+def ocr_missing_pages(file_path: Path, pages: List[str], content_hash: str,
+                      settings: OcrSettings, recognize: bool = True) -> List[str]:
+    """
+    Заменяет текст страниц без текстового слоя результатом OCR.
+
+    Распознаются только страницы с коротким текстом, не больше
+    settings.max_pages на документ. Результаты берутся из кеша по хешу
+    страницы, а промахи распознаются в пуле из settings.workers процессов.
+
+    Args:
+        file_path: Путь к PDF файлу
+        pages: Тексты страниц из текстового слоя
+        content_hash: Хеш содержимого файла
+        settings: Настройки OCR
+        recognize: Распознавать страницы, которых нет в кеше; при False
+            берутся только готовые результаты из кеша, а PDF не открывается
+
+    Returns:
+        Новый список текстов страниц
+    """
+    targets = [i for i, page_text in enumerate(pages) if needs_ocr(page_text, settings.min_chars)]
+    targets = targets[:settings.max_pages]
+    if not targets:
+        return pages
+
+    pages = list(pages)
+    to_recognize = []
+    for page_number in targets:
+        cached = settings.cache.get(page_hash(content_hash, page_number, settings)) if settings.cache else None
+        if cached is not None:
+            pages[page_number] = cached[0]
+        else:
+            to_recognize.append(page_number)
+
+    if to_recognize and recognize:
+        print(f"OCR {len(to_recognize)} стр. в файле {Path(file_path).name}")
+        tasks = [(str(file_path), page_number, settings.dpi, settings.lang) for page_number in to_recognize]
+        if settings.workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(settings.workers, len(tasks))) as executor:
+                recognized = list(executor.map(ocr_page, tasks))
+        else:
+            recognized = [ocr_page(task) for task in tasks]
+
+        for page_number, page_text in zip(to_recognize, recognized):
+            pages[page_number] = page_text
+            if settings.cache:
+                settings.cache.put(page_hash(content_hash, page_number, settings), [page_text])
+
+    return pages
@@ -1,149 +1,596 @@
 import pdfplumber
+import argparse
+import hashlib
+import io
 import os
 import re
+from collections import deque
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
 import sys
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 # Добавляем корень проекта в PYTHONPATH
 sys.path.append(str(Path(__file__).parent.parent))
 
+from database.authors import AuthorResolver
 from database.config import get_db
-from database.models import Article
+from database.models import Article, IngestedFile
+from database import crud
+from database.cache import entity_cache
+from database.copy_loader import copy_articles
+from scripts.ocr_fallback import (
+    OcrSettings, ocr_missing_pages,
+    DEFAULT_DPI, DEFAULT_LANG, MAX_OCR_PAGES, MIN_TEXT_CHARS, OCR_VERSION
+)
+from scripts.text_cache import PageTextCache, DEFAULT_MAX_BYTES
 from sqlalchemy.orm import Session
 
+HASH_CHUNK_SIZE = 1024 * 1024
+# Название и авторы почти всегда на первых страницах статьи
+HEADER_PAGES = 2
+# Увеличивать при любом изменении извлечения текста, чтобы не читать устаревший кеш
+EXTRACTOR_VERSION = 1
+
 
 def get_project_root() -> Path:
     """Возвращает абсолютный путь к корню проекта"""
     return Path(__file__).parent.parent
 
 
-def extract_article_data_from_pdf(file_path: str) -> dict:
+def iter_page_texts(pdf: pdfplumber.PDF) -> Iterator[str]:
     """
-    Извлекает метаданные статьи из PDF файла.
+    Лениво отдает текст страниц PDF по одной.
+
+    После извлечения кеш разобранных объектов страницы сбрасывается,
+    так что в памяти держится только текущая страница.
+    """
+    for page in pdf.pages:
+        page_text = page.extract_text()
+        page.flush_cache()
+        yield page_text or ""
+
+
+def parse_article_header(header_text: str) -> Tuple[str, str]:
+    """
+    Ищет название и авторов статьи в тексте первых страниц.
 
     Args:
-        file_path: Путь к PDF файлу
+        header_text: Текст начальных страниц статьи
 
     Returns:
-        Словарь с данными статьи: {'title', 'authors', 'content'}
+        Кортеж (название, авторы через запятую)
     """
     pattern_fio = r"[А-ЯЁ]\.[А-ЯЁ]\.\s?[А-ЯЁ][а-яё]+"
     pattern_title = r"[А-ЯЁA-Z][А-ЯЁA-Z0-9\s,.-:;!?()]+"
 
-    with pdfplumber.open(file_path) as pdf:
-        # Извлекаем текст со всех страниц
-        full_text = ""
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                full_text += page_text + "\n"
-
-        # Очищаем текст
-        lines = full_text.split("\n")
-        lines = [line.strip() for line in lines if line.strip()]
-        text_cleaned = " ".join(lines)
-        text_cleaned = re.sub(r"\s+", " ", text_cleaned)
-
-        # Поиск авторов
-        authors_match = re.findall(pattern_fio, text_cleaned)
-        authors = ", ".join(authors_match) if authors_match else ""
-
-        # Удалим авторов из текста, чтобы не мешали заголовку
-        text_wo_authors = text_cleaned
-        for match in authors_match:
-            text_wo_authors = text_wo_authors.replace(match, "")
-
-        # Поиск названия — берём первую длинную капс-строку
-        title_match = re.findall(pattern_title, text_wo_authors)
-        title = ""
-        for m in title_match:
-            if len(m.replace(" ", "")) > 20:  # простая эвристика для заголовков
-                title = m
-                break
-
-        return {
-            'title': title,
-            'authors': authors,
-            'content': full_text,
-            'article_url': f"file://{str(Path(file_path).absolute())}"  # Добавляем ссылку на файл
-        }
-
-
-def process_pdfs_to_db(pdf_folder: Path, db: Session, batch_size: int = 10) -> None:
+    # Очищаем текст
+    lines = [line.strip() for line in header_text.split("\n") if line.strip()]
+    text_cleaned = re.sub(r"\s+", " ", " ".join(lines))
+
+    # Поиск авторов
+    authors_match = re.findall(pattern_fio, text_cleaned)
+    authors = ", ".join(authors_match) if authors_match else ""
+
+    # Удалим авторов из текста, чтобы не мешали заголовку
+    text_wo_authors = text_cleaned
+    for match in authors_match:
+        text_wo_authors = text_wo_authors.replace(match, "")
+
+    # Поиск названия — берём первую длинную капс-строку
+    title = ""
+    for m in re.finditer(pattern_title, text_wo_authors):
+        if len(m.group().replace(" ", "")) > 20:  # простая эвристика для заголовков
+            title = m.group()
+            break
+
+    return title, authors
+
+
+def build_article_data(pages: Iterable[str], file_path: str, header_pages: int = HEADER_PAGES) -> dict:
+    """
+    Собирает данные статьи из текстов страниц.
+
+    Название и авторы ищутся только на первых header_pages страницах,
+    а полный текст собирается один раз в конце.
+
+    Args:
+        pages: Тексты страниц по порядку (можно передать ленивый итератор)
+        file_path: Путь к исходному PDF файлу
+        header_pages: Сколько первых страниц использовать для поиска названия и авторов
+
+    Returns:
+        Словарь с данными статьи: {'title', 'authors', 'content', 'article_url'}
+    """
+    content = io.StringIO()
+    header_parts = []
+
+    for page_number, page_text in enumerate(pages):
+        if not page_text:
+            continue
+        content.write(page_text)
+        content.write("\n")
+        if page_number < header_pages:
+            header_parts.append(page_text)
+
+    title, authors = parse_article_header("\n".join(header_parts))
+
+    return {
+        'title': title,
+        'authors': authors,
+        'content': content.getvalue(),
+        'article_url': f"file://{str(Path(file_path).absolute())}"  # Добавляем ссылку на файл
+    }
+
+
+def extract_article_data_from_pdf(file_path: str, header_pages: int = HEADER_PAGES,
+                                  cache: Optional[PageTextCache] = None,
+                                  content_hash: Optional[str] = None,
+                                  ocr: Optional[OcrSettings] = None) -> dict:
+    """
+    Извлекает метаданные статьи из PDF файла.
+
+    Без OCR текст читается постранично и не держится в памяти целиком
+    больше одного раза, в том числе при записи в кеш. С кешем тексты
+    страниц берутся из него, а при промахе извлекаются pdfplumber и сохраняются. С OCR страницы без
+    текстового слоя распознаются tesseract, и в кеш попадает уже
+    распознанный текст: --metadata-only читает только кеш.
+
+    Args:
+        file_path: Путь к PDF файлу
+        header_pages: Сколько первых страниц использовать для поиска названия и авторов
+        cache: Кеш извлеченного текста
+        content_hash: Хеш содержимого файла, ключ для кеша
+        ocr: Настройки OCR для сканированных страниц (None - без OCR)
+
+    Returns:
+        Словарь с данными статьи: {'title', 'authors', 'content', 'article_url'}
+    """
+    use_cache = cache is not None and bool(content_hash)
+    pages = cache.get(content_hash) if use_cache else None
+    if pages is None and ocr is None:
+        # Страницы идут из PDF сразу в разбор и в кеш, не собираясь в список
+        with pdfplumber.open(file_path) as pdf:
+            pages = iter_page_texts(pdf)
+            if use_cache:
+                pages = cache.write_through(content_hash, pages)
+            return build_article_data(pages, file_path, header_pages)
+
+    stale = pages is None
+    if pages is None:
+        with pdfplumber.open(file_path) as pdf:
+            pages = list(iter_page_texts(pdf))
+
+    if ocr is not None:
+        recognized = ocr_missing_pages(file_path, pages, content_hash or file_content_hash(file_path), ocr)
+        # Запись кеша без распознанных страниц (сохранена до OCR) перезаписывается
+        stale = stale or recognized is not pages
+        pages = recognized
+    if use_cache and stale:
+        cache.put(content_hash, pages)
+    return build_article_data(pages, file_path, header_pages)
+
+
+def file_content_hash(file_path: Path) -> str:
+    """Считает sha256 содержимого файла, не загружая его целиком в память"""
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def manifest_entry(file_path: Path, stat: os.stat_result, content_hash: str,
+                   status: str, article_id: Optional[int] = None) -> dict:
+    """Формирует запись манифеста загруженных файлов"""
+    return {
+        'file_path': str(file_path),
+        'file_size': stat.st_size,
+        'file_mtime_ns': stat.st_mtime_ns,
+        'content_hash': content_hash,
+        'status': status,
+        'article_id': article_id,
+        'ingested_at': datetime.now(),
+    }
+
+
+def filter_unchanged_files(files: List[Path], manifest: Dict[str, IngestedFile]
+                           ) -> Tuple[List[Path], Dict[Path, os.stat_result], List[dict]]:
+    """
+    Отбрасывает файлы, которые уже есть в манифесте и не менялись.
+
+    Файл с теми же размером и mtime пропускается без чтения. Если размер или
+    mtime изменились, сравнивается хеш содержимого: при совпадении обновляется
+    только запись манифеста, а PDF не разбирается.
+
+    Returns:
+        Кортеж (файлы для обработки, stat каждого файла, обновления манифеста)
+    """
+    to_process = []
+    stats = {}
+    refreshed = []
+
+    for file_path in files:
+        stat = file_path.stat()
+        stats[file_path] = stat
+        entry = manifest.get(str(file_path))
+
+        if entry is None:
+            to_process.append(file_path)
+        elif entry.file_size == stat.st_size and entry.file_mtime_ns == stat.st_mtime_ns:
+            continue
+        else:
+            content_hash = file_content_hash(file_path)
+            if content_hash == entry.content_hash:
+                refreshed.append(manifest_entry(file_path, stat, content_hash, entry.status, entry.article_id))
+            else:
+                to_process.append(file_path)
+
+    return to_process, stats, refreshed
+
+
+def list_pdf_files(pdf_folder: Path) -> List[Path]:
+    """Возвращает PDF файлы папки в том порядке, в котором их обходит обработчик"""
+    pdf_folder = pdf_folder.resolve()
+    return [pdf_folder / filename for filename in os.listdir(pdf_folder) if filename.endswith(".pdf")]
+
+
+def _extract_safe(file_path: Path, cache: Optional[PageTextCache] = None,
+                  ocr: Optional[OcrSettings] = None) -> Tuple[Path, Optional[dict], Optional[str]]:
+    """
+    Обертка над extract_article_data_from_pdf для запуска в пуле процессов.
+
+    Исключение одного файла не должно ронять весь пул, поэтому ошибка
+    возвращается строкой вместе с результатом.
+    """
+    try:
+        content_hash = file_content_hash(file_path)
+        article_data = extract_article_data_from_pdf(file_path, cache=cache, content_hash=content_hash, ocr=ocr)
+        article_data['content_hash'] = content_hash
+        return file_path, article_data, None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+def iter_extracted_serial(files: List[Path], cache: Optional[PageTextCache] = None,
+                          ocr: Optional[OcrSettings] = None
+                          ) -> Iterator[Tuple[Path, Optional[dict], Optional[str]]]:
+    """Последовательно извлекает данные из файлов в текущем процессе"""
+    for file_path in files:
+        print(f"Обработка файла: {file_path.name}")
+        yield _extract_safe(file_path, cache, ocr)
+
+
+def iter_extracted_parallel(files: List[Path], workers: int,
+                            max_in_flight: Optional[int] = None,
+                            cache: Optional[PageTextCache] = None,
+                            ocr: Optional[OcrSettings] = None
+                            ) -> Iterator[Tuple[Path, Optional[dict], Optional[str]]]:
+    """
+    Извлекает данные из файлов в пуле процессов.
+
+    Результаты отдаются в порядке исходного списка файлов, поэтому запись
+    в базу идет так же, как при последовательной обработке. Одновременно
+    в работе находится не более max_in_flight файлов, чтобы память не росла
+    вместе с размером папки.
+
+    Args:
+        files: Список PDF файлов
+        workers: Количество процессов-извлекателей
+        max_in_flight: Ограничение на число файлов в работе (по умолчанию 2 * workers)
+        cache: Кеш извлеченного текста, общий для всех процессов
+        ocr: Настройки OCR; внутри процессов пула OCR идет последовательно,
+            так как ядра уже заняты разбором файлов
+    """
+    if ocr is not None and ocr.workers > 1:
+        ocr = replace(ocr, workers=1)
+    max_in_flight = max_in_flight or workers * 2
+    pending = deque()
+    files_iter = iter(files)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for file_path in islice(files_iter, max_in_flight):
+            pending.append(executor.submit(_extract_safe, file_path, cache, ocr))
+
+        while pending:
+            file_path, article_data, error = pending.popleft().result()
+            print(f"Обработка файла: {file_path.name}")
+
+            # Освободившееся место сразу занимаем следующим файлом
+            for next_path in islice(files_iter, 1):
+                pending.append(executor.submit(_extract_safe, next_path, cache, ocr))
+
+            yield file_path, article_data, error
+
+
+LOADERS = {
+    'upsert': crud.bulk_upsert_articles,
+    'copy': copy_articles,
+}
+
+
+def _save_batch(db: Session, batch: List[Tuple[dict, dict]], manifest_entries: List[dict],
+                loader: str = 'upsert', resolver: Optional[AuthorResolver] = None) -> Tuple[int, int]:
+    """
+    Сохраняет батч статей, их связи с авторами и записи манифеста в одной транзакции.
+
+    Returns:
+        Кортеж (вставлено статей, пропущено как дубли или уже загруженные из того же файла)
+    """
+    inserted = []
+    results = LOADERS[loader](db, [article_data for article_data, _ in batch]) if batch else []
+    for (article_data, entry), (status, article_id) in zip(batch, results):
+        entry['article_id'] = article_id
+        if status == 'inserted':
+            inserted.append((article_id, article_data['authors']))
+        elif status == 'duplicate':
+            # 'existing' (тот же файл при запуске с --force) оставляет запись манифеста ingested
+            entry['status'] = 'duplicate'
+            print(f"Статья с заголовком '{article_data['title']}' уже существует, пропускаем")
+    if resolver is not None and inserted:
+        resolver.link_articles(db, inserted)
+    crud.upsert_ingested_files(db, manifest_entries + [entry for _, entry in batch])
+    db.commit()
+    return len(inserted), len(batch) - len(inserted)
+
+
+def process_pdfs_to_db(pdf_folder: Path, db: Session, batch_size: int = 10,
+                       workers: int = 1, max_in_flight: Optional[int] = None,
+                       force: bool = False, loader: str = 'upsert',
+                       cache: Optional[PageTextCache] = None,
+                       ocr: Optional[OcrSettings] = None) -> None:
     """
     Обрабатывает все PDF в папке и сохраняет их в базу данных.
 
+    При workers > 1 PDF разбираются в пуле процессов, а запись в базу
+    по-прежнему идет из текущего процесса батчами. Файлы, которые уже
+    есть в манифесте и не менялись, не открываются. Дубли отсекаются
+    на уровне батча одним запросом и ON CONFLICT по хешу файла.
+
     Args:
         pdf_folder: Путь к папке с PDF файлами (Path объект)
         db: Сессия SQLAlchemy
         batch_size: Размер батча для групповой вставки
+        workers: Количество процессов для извлечения текста
+        max_in_flight: Максимум файлов, одновременно находящихся в пуле
+        force: Игнорировать манифест и разобрать все файлы заново
+        loader: Способ записи батча: 'upsert' (INSERT ... ON CONFLICT) или
+            'copy' (COPY во временную таблицу, для больших загрузок с крупным batch_size)
+        cache: Кеш извлеченного текста
+        ocr: Настройки OCR для сканированных страниц (None - без OCR)
     """
     processed_files = 0
     skipped_files = 0
     batch = []
 
-    for filename in os.listdir(pdf_folder):
-        if not filename.endswith(".pdf"):
-            continue
+    files = list_pdf_files(pdf_folder)
+    manifest = {} if force else crud.get_ingest_manifest(db)
+    files, stats, manifest_entries = filter_unchanged_files(files, manifest)
+    unchanged_files = len(stats) - len(files)
+    if unchanged_files:
+        print(f"Без изменений с прошлой загрузки: {unchanged_files} файлов, пропускаем")
 
-        file_path = pdf_folder / filename
-        print(f"Обработка файла: {filename}")
+    # Индекс авторов загружается один раз на запуск, дальше только дополняется
+    resolver = AuthorResolver(db)
 
+    if workers > 1:
+        extracted = iter_extracted_parallel(files, workers, max_in_flight, cache, ocr)
+    else:
+        extracted = iter_extracted_serial(files, cache, ocr)
+
+    def flush():
+        nonlocal processed_files, skipped_files
         try:
-            article_data = extract_article_data_from_pdf(file_path)
+            inserted, duplicates = _save_batch(db, batch, manifest_entries, loader, resolver)
+        except Exception as e:
+            db.rollback()
+            # В индексе могли остаться id авторов из откаченной транзакции
+            resolver.reload(db)
+            print(f"Ошибка при сохранении батча из {len(batch)} статей: {str(e)}")
+            skipped_files += len(batch)
+        else:
+            processed_files += inserted
+            skipped_files += duplicates
+            if inserted:
+                print(f"Сохранено {inserted} статей в базу данных")
+        batch.clear()
+        manifest_entries.clear()
+
+    for file_path, article_data, error in extracted:
+        filename = file_path.name
+
+        if error is not None:
+            print(f"Ошибка при обработке файла {filename}: {error}")
+            skipped_files += 1
+            continue
 
-            if not article_data['title']:
-                print(f"Не удалось извлечь заголовок из файла {filename}, пропускаем")
-                skipped_files += 1
-                continue
+        entry = manifest_entry(file_path, stats[file_path], article_data['content_hash'], 'ingested')
 
-            # Проверяем, существует ли уже статья с таким заголовком
-            existing_article = db.query(Article).filter(
-                Article.title == article_data['title']
-            ).first()
+        if not article_data['title']:
+            print(f"Не удалось извлечь заголовок из файла {filename}, пропускаем")
+            entry['status'] = 'no_title'
+            manifest_entries.append(entry)
+            skipped_files += 1
+            continue
 
-            if existing_article:
-                print(f"Статья с заголовком '{article_data['title']}' уже существует, пропускаем")
-                skipped_files += 1
-                continue
+        batch.append((article_data, entry))
 
-            # Создаем объект статьи для добавления в базу
-            new_article = Article(
-                title=article_data['title'],
-                authors=article_data['authors'],
-                content=article_data['content'],
-                created_at=datetime.now(),
-                updated_at=datetime.now()
-            )
+        # Если набрали батч, сохраняем
+        if len(batch) >= batch_size:
+            flush()
 
-            batch.append(new_article)
-            processed_files += 1
+    # Сохраняем оставшиеся статьи в батче
+    if batch or manifest_entries:
+        flush()
 
-            # Если набрали батч, сохраняем
-            if len(batch) >= batch_size:
-                db.bulk_save_objects(batch)
-                db.commit()
-                batch = []
-                print(f"Сохранено {batch_size} статей в базу данных")
+    print(f"\nОбработка завершена. Обработано файлов: {processed_files}, пропущено: {skipped_files}, "
+          f"без изменений: {unchanged_files}")
 
-        except Exception as e:
-            print(f"Ошибка при обработке файла {filename}: {str(e)}")
-            skipped_files += 1
 
-    # Сохраняем оставшиеся статьи в батче
-    if batch:
-        db.bulk_save_objects(batch)
-        db.commit()
-        print(f"Сохранено {len(batch)} статей в базу данных")
+def reextract_metadata(db: Session, cache: PageTextCache, header_pages: int = HEADER_PAGES,
+                       batch_size: int = 500, ocr: Optional[OcrSettings] = None) -> None:
+    """
+    Заново ищет названия и авторов по тексту из кеша, не открывая PDF.
 
-    print(f"\nОбработка завершена. Обработано файлов: {processed_files}, пропущено: {skipped_files}")
+    Для уже загруженных статей обновляются title и authors, если они
+    изменились. Файлы, у которых раньше не нашлось названия, загружаются
+    как новые статьи, если новые эвристики название нашли. Файлы без
+    записи в кеше пропускаются. Если в кеше лежит текст до OCR, сканированные
+    страницы берутся из кеша OCR (сам OCR не запускается), иначе название
+    нашлось бы уже на следующей странице и затерло бы распознанное.
+
+    Args:
+        db: Сессия SQLAlchemy
+        cache: Кеш извлеченного текста
+        header_pages: Сколько первых страниц использовать для поиска названия и авторов
+        batch_size: Сколько записей манифеста обрабатывать за одну транзакцию
+        ocr: Настройки OCR с кешем распознанных страниц (None - без OCR)
+    """
+    entries = (
+        db.query(IngestedFile)
+        .filter(IngestedFile.status.in_(('ingested', 'no_title')))
+        .order_by(IngestedFile.file_id)
+        .all()
+    )
+    updated = 0
+    added = 0
+    cache_misses = 0
+    resolver = AuthorResolver(db)
+
+    for start in range(0, len(entries), batch_size):
+        updates = {}
+        new_articles = []
+
+        for entry in entries[start:start + batch_size]:
+            pages = cache.get(entry.content_hash)
+            if pages is None:
+                cache_misses += 1
+                continue
+            if ocr is not None and ocr.cache is not None:
+                pages = ocr_missing_pages(entry.file_path, pages, entry.content_hash, ocr, recognize=False)
+
+            article_data = build_article_data(pages, entry.file_path, header_pages)
+            if not article_data['title']:
+                continue
+
+            if entry.status == 'ingested' and entry.article_id is not None:
+                updates[entry.article_id] = article_data
+            elif entry.status == 'no_title':
+                article_data['content_hash'] = entry.content_hash
+                new_articles.append((article_data, {
+                    'file_path': entry.file_path,
+                    'file_size': entry.file_size,
+                    'file_mtime_ns': entry.file_mtime_ns,
+                    'content_hash': entry.content_hash,
+                    'status': 'ingested',
+                    'article_id': None,
+                    'ingested_at': datetime.now(),
+                }))
+
+        # Обновляем только статьи, у которых метаданные действительно поменялись
+        changed = []
+        if updates:
+            current = db.query(Article.article_id, Article.title, Article.authors).filter(
+                Article.article_id.in_(updates)
+            )
+            for article_id, title, authors in current:
+                article_data = updates[article_id]
+                if (title, authors) != (article_data['title'], article_data['authors']):
+                    changed.append({
+                        'article_id': article_id,
+                        'title': article_data['title'],
+                        'authors': article_data['authors'],
+                        'updated_at': datetime.now(),
+                    })
+        if changed:
+            db.bulk_update_mappings(Article, changed)
+            resolver.link_articles(
+                db, [(article['article_id'], article['authors']) for article in changed], replace=True
+            )
+            updated += len(changed)
+
+        if new_articles:
+            inserted, _ = _save_batch(db, new_articles, [], resolver=resolver)
+            added += inserted
+        else:
+            db.commit()
+        entity_cache.invalidate('article', *(article['article_id'] for article in changed))
+
+    print(f"Метаданные пересчитаны. Обновлено статей: {updated}, добавлено новых: {added}, "
+          f"нет в кеше: {cache_misses}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Загрузка статей из PDF в базу данных")
+    parser.add_argument("--folder", type=Path, default=get_project_root() / "TestData",
+                        help="Папка с PDF файлами (по умолчанию TestData в корне проекта)")
+    parser.add_argument("--batch-size", type=int, default=10, help="Размер батча для записи в базу")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Количество процессов для разбора PDF (0 - по числу ядер)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Максимум файлов в работе одновременно (по умолчанию 2 * workers)")
+    parser.add_argument("--force", action="store_true",
+                        help="Игнорировать манифест и заново разобрать все файлы")
+    parser.add_argument("--loader", choices=sorted(LOADERS), default="upsert",
+                        help="Способ записи в базу: upsert или copy (COPY FROM STDIN)")
+    parser.add_argument("--cache-dir", type=Path, default=get_project_root() / ".cache" / "pdf_text",
+                        help="Папка кеша извлеченного текста")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // 1024 ** 2,
+                        help="Максимальный размер кеша в мегабайтах")
+    parser.add_argument("--no-cache", action="store_true", help="Не использовать кеш извлеченного текста")
+    parser.add_argument("--metadata-only", action="store_true",
+                        help="Только пересчитать названия и авторов по кешу, не открывая PDF")
+    parser.add_argument("--ocr", action="store_true",
+                        help="Распознавать страницы без текстового слоя (tesseract)")
+    parser.add_argument("--ocr-dpi", type=int, default=DEFAULT_DPI, help="DPI растеризации страниц для OCR")
+    parser.add_argument("--ocr-lang", default=DEFAULT_LANG, help="Языки tesseract")
+    parser.add_argument("--ocr-min-chars", type=int, default=MIN_TEXT_CHARS,
+                        help="Страница с меньшим числом символов в текстовом слое отправляется на OCR")
+    parser.add_argument("--ocr-max-pages", type=int, default=MAX_OCR_PAGES,
+                        help="Максимум страниц на OCR в одном файле")
+    parser.add_argument("--ocr-workers", type=int, default=0,
+                        help="Процессов для OCR при последовательной обработке (0 - по числу ядер)")
+    parser.add_argument("--ocr-cache-dir", type=Path, default=get_project_root() / ".cache" / "pdf_ocr",
+                        help="Папка кеша результатов OCR")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    # Определяем путь к папке TestData в корне проекта
-    pdf_folder = get_project_root() / "TestData"
+    args = parse_args()
+    pdf_folder = args.folder
+    workers = args.workers or os.cpu_count() or 1
+    cache = None
+    if not args.no_cache:
+        cache = PageTextCache(args.cache_dir, EXTRACTOR_VERSION, max_bytes=args.cache_max_mb * 1024 ** 2)
+    ocr = None
+    # В режиме --metadata-only OCR не запускается, но готовые результаты из его кеша нужны всегда
+    if args.ocr or (args.metadata_only and not args.no_cache):
+        ocr = OcrSettings(
+            dpi=args.ocr_dpi,
+            lang=args.ocr_lang,
+            min_chars=args.ocr_min_chars,
+            max_pages=args.ocr_max_pages,
+            workers=args.ocr_workers or os.cpu_count() or 1,
+            cache=None if args.no_cache else PageTextCache(
+                args.ocr_cache_dir, OCR_VERSION, max_bytes=args.cache_max_mb * 1024 ** 2
+            ),
+        )
+
+    if args.metadata_only:
+        if cache is None:
+            print("Режим --metadata-only работает только с кешем, уберите --no-cache")
+            exit(1)
+        db = next(get_db())
+        try:
+            reextract_metadata(db, cache, ocr=ocr)
+        except Exception as e:
+            print(f"Критическая ошибка: {str(e)}")
+        finally:
+            db.close()
+        exit(0)
 
     if not pdf_folder.exists():
         print(f"Папка {pdf_folder} не существует! Создайте папку TestData в корне проекта.")
@@ -157,9 +604,11 @@ if __name__ == "__main__":
     db = next(get_db())
 
     try:
-        print(f"Начата обработка PDF из папки: {pdf_folder}")
-        process_pdfs_to_db(pdf_folder, db)
+        print(f"Начата обработка PDF из папки: {pdf_folder} (процессов: {workers})")
+        process_pdfs_to_db(pdf_folder, db, batch_size=args.batch_size,
+                           workers=workers, max_in_flight=args.max_in_flight,
+                           force=args.force, loader=args.loader, cache=cache, ocr=ocr)
     except Exception as e:
         print(f"Критическая ошибка: {str(e)}")
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
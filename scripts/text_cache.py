@@ -0,0 +1,180 @@
+import gzip
+import json
+import os
+import tempfile
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# 2 ГБ по умолчанию
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+# После переполнения чистим кеш до этой доли от лимита, чтобы не вытеснять на каждой записи
+EVICT_TARGET_RATIO = 0.9
+# Общий для всех процессов журнал размеров записей: первая строка - размер кеша
+# на момент последнего пересчета, дальше по строке на каждую новую запись
+SIZE_LOG_NAME = "size.log"
+
+
+class PageTextCache:
+    """
+    Сжатый кеш постраничного текста PDF на диске.
+
+    Ключ - хеш содержимого файла и версия извлекателя, поэтому при смене
+    алгоритма извлечения старые записи просто перестают использоваться
+    и со временем вытесняются. Запись атомарна (через временный файл),
+    так что кеш можно использовать из нескольких процессов одновременно.
+    При превышении max_bytes удаляются давно не читавшиеся записи.
+
+    Запись хранится как JSON-строки, по одной на страницу, и пишется по мере
+    поступления страниц. Размер кеша процессы узнают из общего журнала
+    size.log, дочитывая только новые строки, а не обходя весь каталог.
+    """
+
+    def __init__(self, cache_dir: Path, version: int, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.version = version
+        self.max_bytes = max_bytes
+        # (inode журнала, прочитано байт, размер кеша по прочитанной части)
+        self._size_log_state: Optional[Tuple[int, int, int]] = None
+
+    def _entry_path(self, content_hash: str) -> Path:
+        return self.cache_dir / f"v{self.version}" / content_hash[:2] / f"{content_hash}.jsonl.gz"
+
+    def get(self, content_hash: str) -> Optional[List[str]]:
+        """Возвращает список текстов страниц или None, если записи нет"""
+        path = self._entry_path(content_hash)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                pages = [json.loads(line) for line in f]
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        # Обновляем mtime, чтобы запись считалась недавно использованной
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return pages
+
+    def put(self, content_hash: str, pages: Iterable[str]) -> None:
+        """Сохраняет тексты страниц и при необходимости вытесняет старые записи"""
+        deque(self.write_through(content_hash, pages), maxlen=0)
+
+    def write_through(self, content_hash: str, pages: Iterable[str]) -> Iterator[str]:
+        """
+        Отдает страницы дальше, по ходу сжимая их во временный файл записи.
+
+        Целиком документ в памяти не собирается. Запись появляется в кеше,
+        только если итератор дочитан до конца; при ошибке или брошенном
+        итераторе временный файл удаляется.
+        """
+        path = self._entry_path(content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                for page_text in pages:
+                    f.write(json.dumps(page_text, ensure_ascii=False).encode("utf-8"))
+                    f.write(b"\n")
+                    yield page_text
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        total = self._record_size(path.stat().st_size)
+        if total > self.max_bytes:
+            self.evict()
+
+    def _size_log_path(self) -> Path:
+        return self.cache_dir / SIZE_LOG_NAME
+
+    def _read_size_log(self) -> Optional[int]:
+        """Дочитывает новые строки журнала и возвращает размер кеша (None - журнала нет)"""
+        path = self._size_log_path()
+        try:
+            with open(path, "rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                # После evict журнал заменяется новым файлом, тогда читаем его с начала
+                if self._size_log_state is None or self._size_log_state[0] != inode:
+                    offset, total = 0, 0
+                else:
+                    _, offset, total = self._size_log_state
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        # Последняя строка может быть еще не дописана другим процессом
+        end = data.rfind(b"\n") + 1
+        total += sum(int(line) for line in data[:end].split())
+        self._size_log_state = (inode, offset + end, total)
+        return total
+
+    def _reset_size_log(self, total: int) -> None:
+        """Атомарно заменяет журнал одной строкой с пересчитанным размером"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(f"{total}\n".encode("ascii"))
+            os.replace(tmp_path, self._size_log_path())
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self._size_log_state = None
+
+    def _record_size(self, size: int) -> int:
+        """Добавляет размер новой записи в журнал и возвращает текущий размер кеша"""
+        if self._read_size_log() is None:
+            # Первый запуск: один полный обход каталога, уже с новой записью
+            total = self.size_bytes()
+            self._reset_size_log(total)
+            return total
+        # Короткая запись в режиме O_APPEND не перемешивается с записями других процессов
+        fd = os.open(self._size_log_path(), os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, f"{size}\n".encode("ascii"))
+        finally:
+            os.close(fd)
+        return self._read_size_log()
+
+    def _entries(self) -> List[os.DirEntry]:
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for root, _, files in os.walk(self.cache_dir):
+            with os.scandir(root) as it:
+                # .json.gz - записи старого формата, они только вытесняются
+                entries.extend(e for e in it if e.is_file() and e.name.endswith((".jsonl.gz", ".json.gz")))
+        return entries
+
+    def size_bytes(self) -> int:
+        """Текущий размер кеша на диске"""
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def evict(self) -> int:
+        """
+        Удаляет самые давно использованные записи, пока кеш не станет
+        меньше EVICT_TARGET_RATIO от лимита.
+
+        Returns:
+            Количество удаленных записей
+        """
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        target = self.max_bytes * EVICT_TARGET_RATIO
+        removed = 0
+
+        for entry in entries:
+            if total <= target:
+                break
+            size = entry.stat().st_size
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        self._reset_size_log(total)
+        return removed
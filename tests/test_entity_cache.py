@@ -0,0 +1,86 @@
+"""
+Проверка read-through кеша ORM-объектов (database.cache.entity_cache) через crud.
+
+Как и tests/test_async_crud_parity.py, запускается только против локального
+PostgreSQL с примененными миграциями; созданные статьи удаляются после теста.
+"""
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+# Добавляем корень проекта в PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+pytest.importorskip("sqlalchemy")
+from sqlalchemy import delete
+from sqlalchemy.engine import make_url
+
+from database import crud, models
+from database.cache import entity_cache
+from database.config import SessionLocal
+
+
+def _local_database_url() -> bool:
+    url = os.getenv("DATABASE_URL")
+    return bool(url) and make_url(url).host in ("localhost", "127.0.0.1", "::1")
+
+
+pytestmark = pytest.mark.skipif(
+    not _local_database_url(), reason="нужен DATABASE_URL локального PostgreSQL"
+)
+
+
+@pytest.fixture
+def article_id():
+    db = SessionLocal()
+    try:
+        article = crud.create_article(db, {'title': f"CACHE{uuid.uuid4().hex[:10]} исходный заголовок"})
+        article_id = article.article_id
+    finally:
+        db.close()
+    yield article_id
+    db = SessionLocal()
+    try:
+        db.execute(delete(models.Article).where(models.Article.article_id == article_id))
+        db.commit()
+    finally:
+        db.close()
+    entity_cache.invalidate('article', article_id)
+
+
+def test_uncommitted_changes_are_not_cached(article_id):
+    first = SessionLocal()
+    second = SessionLocal()
+    try:
+        article = crud.get_article(first, article_id)
+        original_title = article.title
+        article.title = f"{original_title} (не закоммичено)"
+
+        # Промах кеша: loader вернет измененный объект из identity map первой сессии
+        entity_cache.invalidate('article', article_id)
+        assert crud.get_article(first, article_id) is article
+        assert article.title.endswith("(не закоммичено)")
+
+        # Вторая сессия не видит незакоммиченное изменение и не падает на merge
+        assert crud.get_article(second, article_id).title == original_title
+        second.expunge_all()
+        assert crud.get_article(second, article_id).title == original_title
+    finally:
+        first.rollback()
+        first.close()
+        second.close()
+
+
+def test_cache_hit_keeps_pending_changes_in_session(article_id):
+    db = SessionLocal()
+    try:
+        crud.get_article(db, article_id)  # заполняет кеш
+        article = crud.get_article(db, article_id)
+        article.title = "изменено в сессии"
+        assert crud.get_article(db, article_id).title == "изменено в сессии"
+    finally:
+        db.rollback()
+        db.close()